@@ -0,0 +1,211 @@
+"""
+Rottikol benchmark suite (offline, no network).
+
+Measures:
+- AES-256-IGE throughput (MB/s) at several payload sizes, per AES engine/backend
+- Batched AES-256-IGE (aes_ige_encrypt_many) vs a per-message loop (msgs/s)
+- HMAC-SHA256 / HKDF ops/s
+- RSA keygen / encrypt / decrypt and DH keygen / shared latency (percentiles)
+- RottikolSession encrypt / decrypt msgs/s
+
+Usage:
+  python3 bench.py [--quick] [--output results.json]
+  python3 bench.py --compare baseline.json [--threshold 0.10]
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+
+import client
+
+
+def _percentiles(samples):
+    s = sorted(samples)
+    pick = lambda q: s[min(len(s) - 1, int(q * len(s)))]
+    return {
+        'p50_ms': pick(0.50) * 1e3,
+        'p90_ms': pick(0.90) * 1e3,
+        'p99_ms': pick(0.99) * 1e3,
+        'mean_ms': sum(s) / len(s) * 1e3,
+    }
+
+
+def _latency(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return _percentiles(samples)
+
+
+def _rate(fn, min_time):
+    """Calls fn until min_time seconds pass; returns calls per second."""
+    calls, t0 = 0, time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time:
+            return calls / elapsed
+
+
+def bench_aes_ige(sizes, min_time):
+    key, iv = client.random_bytes(32), client.random_bytes(32)
+    results = {}
+    impls = [('engine:' + name, lambda d, e=name: client.aes_ige_encrypt(key, iv, d, e))
+             for name in client.AES_ENGINES]
+    impls += [('backend:' + name, lambda d, b=client.get_backend(name): b.aes_ige_encrypt(key, iv, d))
+              for name in client.available_backends()]
+    for label, encrypt in impls:
+        for size in sizes:
+            data = client.random_bytes(size)
+            ops = _rate(lambda: encrypt(data), min_time)
+            results['aes_ige_encrypt[%s,%d]' % (label, size)] = {'mb_per_s': ops * size / 1e6}
+    return results
+
+
+def bench_aes_ige_batch(batches, min_time):
+    """Batched IGE vs a per-message loop on each backend; batches is {label: [sizes]}."""
+    results = {}
+    for name in client.available_backends():
+        backend = client.get_backend(name)
+        for label, sizes in batches.items():
+            keys = [client.random_bytes(32) for _ in sizes]
+            ivs = [client.random_bytes(32) for _ in sizes]
+            datas = [client.random_bytes(size) for size in sizes]
+            batch = _rate(lambda: backend.aes_ige_encrypt_many(keys, ivs, datas), min_time)
+            loop = _rate(lambda: [backend.aes_ige_encrypt(k, iv, d) for k, iv, d in zip(keys, ivs, datas)],
+                         min_time)
+            results['aes_ige_encrypt_many[%s,%s]' % (name, label)] = {'msgs_per_s': batch * len(sizes)}
+            results['aes_ige_encrypt_loop[%s,%s]' % (name, label)] = {'msgs_per_s': loop * len(sizes)}
+    return results
+
+
+def bench_mac_kdf(min_time):
+    key, msg = client.random_bytes(32), client.random_bytes(64)
+    prepared = client.HMACKey(key)
+    return {
+        'hmac_sha256': {'ops_per_s': _rate(lambda: client.hmac_sha256(key, msg), min_time)},
+        'hmac_sha256[prepared]': {'ops_per_s': _rate(lambda: prepared.mac(msg), min_time)},
+        'hkdf[64]': {'ops_per_s': _rate(lambda: client.hkdf(key, msg, b'info', 64), min_time)},
+    }
+
+
+def bench_rsa(keygen_iterations, op_iterations):
+    key = client.RSAKey.generate(2048)
+    msg = client.random_bytes(32)
+    ct = key.encrypt_bytes(msg)
+    blinded = client.RSAKey.import_private(key.export_private(), blinding=True)
+    return {
+        'rsa_keygen[2048]': _latency(lambda: client.RSAKey.generate(2048), keygen_iterations),
+        'rsa_encrypt[2048]': _latency(lambda: key.encrypt_bytes(msg), op_iterations),
+        'rsa_decrypt[2048]': _latency(lambda: key.decrypt_bytes(ct), op_iterations),
+        'rsa_decrypt[2048,blinded]': _latency(lambda: blinded.decrypt_bytes(ct), op_iterations),
+    }
+
+
+def bench_dh(iterations):
+    client.dh_fixed_base()  # table build is a one-off, keep it out of the samples
+    peer = client.DHKeyPair()
+    mine = client.DHKeyPair()
+    return {
+        'dh_keygen': _latency(client.DHKeyPair, iterations),
+        'dh_keygen[short]': _latency(lambda: client.DHKeyPair(short_exponent=True), iterations),
+        'dh_shared': _latency(lambda: mine.compute_shared(peer.public), iterations),
+    }
+
+
+def bench_session(sizes, min_time):
+    session = client.RottikolSession.create_from_dh(client.random_bytes(256))
+    results = {}
+    for size in sizes:
+        msg = client.random_bytes(size)
+        payload = session.encrypt(msg)
+        results['session_encrypt[%d]' % size] = {
+            'msgs_per_s': _rate(lambda: session.encrypt(msg), min_time)}
+        results['session_decrypt[%d]' % size] = {
+            'msgs_per_s': _rate(lambda: session.decrypt(payload), min_time)}
+    return results
+
+
+def run(quick=False):
+    min_time = 0.2 if quick else 1.0
+    results = {}
+    results.update(bench_aes_ige([1024, 16384] if quick else [1024, 16384, 262144], min_time))
+    results.update(bench_aes_ige_batch({
+        '256x64': [64] * 256,
+        'mixed': [16] * 199 + [16384 if quick else 262144],
+    }, min_time))
+    results.update(bench_mac_kdf(min_time))
+    results.update(bench_rsa(2 if quick else 10, 10 if quick else 50))
+    results.update(bench_dh(10 if quick else 50))
+    results.update(bench_session([16, 1024] if quick else [16, 1024, 16384], min_time))
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'backend': client.get_backend().name,
+            'numpy': client.np is not None,
+            'quick': quick,
+            'time': time.time(),
+        },
+        'results': results,
+    }
+
+
+# Metrics where a larger value is better; every other metric is a latency
+_HIGHER_IS_BETTER = ('mb_per_s', 'ops_per_s', 'msgs_per_s')
+
+
+def compare(current, baseline, threshold):
+    """Returns a list of regressions worse than `threshold` (fractional) vs baseline."""
+    regressions = []
+    for name, metrics in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if not base:
+            continue
+        for metric, value in metrics.items():
+            old = base.get(metric)
+            if not old:
+                continue
+            if metric in _HIGHER_IS_BETTER:
+                change = (old - value) / old
+            else:
+                change = (value - old) / old
+            if change > threshold:
+                regressions.append((name, metric, old, value, change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rottikol benchmark suite")
+    parser.add_argument('--quick', action='store_true', help="fewer iterations")
+    parser.add_argument('--output', help="write results as JSON to this file")
+    parser.add_argument('--compare', metavar='BASELINE', help="flag regressions against a saved JSON run")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="regression threshold as a fraction (default 0.10)")
+    args = parser.parse_args(argv)
+
+    report = run(args.quick)
+    for name, metrics in report['results'].items():
+        print("%-40s %s" % (name, "  ".join("%s=%.3f" % kv for kv in metrics.items())))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for name, metric, old, new, change in regressions:
+            print("REGRESSION %s %s: %.3f -> %.3f (%+.1f%%)" % (name, metric, old, new, change * 100))
+        if regressions:
+            return 1
+        print("No regressions above %.0f%%" % (args.threshold * 100))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -20,6 +20,24 @@ import struct
 import secrets
 import math
 import time
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+import json
+import threading
+import weakref
+from collections import OrderedDict, deque
+
+try:
+    import numpy as np  # optional: enables batched multi-message AES-IGE
+except ImportError:
+    np = None
+
+try:
+    # optional: enables the "accelerated" crypto backend
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+    from cryptography.hazmat.primitives.asymmetric import rsa as crypto_rsa, padding as crypto_padding
+except ImportError:
+    Cipher = None
 
 #############
 # Utilities #
@@ -48,33 +66,62 @@ def unpad_pkcs7(data):
 def random_bytes(n):
     return secrets.token_bytes(n)
 
+def nonzero_random_bytes(n):
+    """n random non-zero bytes: one CSPRNG draw (plus ~1% slack), zeros dropped in one pass."""
+    out = b""
+    while len(out) < n:
+        need = n - len(out)
+        out += secrets.token_bytes(need + need // 64 + 8).replace(b"\x00", b"")
+    return out[:n]
+
 def sha1(data):
     return hashlib.sha1(data).digest()
 
 def sha256(data):
     return hashlib.sha256(data).digest()
 
+class HMACKey:
+    """
+    HMAC-SHA256 key context (RFC2104): the inner and outer SHA-256 states are
+    keyed once, so each MAC only copies and updates them.
+    """
+    __slots__ = ('_inner', '_outer')
+    block_size = 64
+
+    def __init__(self, key):
+        if len(key) > self.block_size:
+            key = sha256(key)
+        key = bytes(key).ljust(self.block_size, b'\x00')
+        self._inner = hashlib.sha256(xor_bytes(key, b'\x36' * self.block_size))
+        self._outer = hashlib.sha256(xor_bytes(key, b'\x5c' * self.block_size))
+
+    def mac(self, *parts):
+        """HMAC over the concatenation of parts (no concatenation is performed)."""
+        inner = self._inner.copy()
+        for p in parts:
+            inner.update(p)
+        outer = self._outer.copy()
+        outer.update(inner.digest())
+        return outer.digest()
+
 def hmac_sha256(key, msg):
     """Manual HMAC-SHA256, RFC2104."""
-    block_size = 64
-    if len(key) > block_size:
-        key = sha256(key)
-    key = key.ljust(block_size, b'\x00')
-    o_key_pad = xor_bytes(key, b'\x5c' * block_size)
-    i_key_pad = xor_bytes(key, b'\x36' * block_size)
-    return sha256(o_key_pad + sha256(i_key_pad + msg))
+    return HMACKey(key).mac(msg)
 
 def hkdf_extract(salt, ikm):
     return hmac_sha256(salt, ikm)
 
 def hkdf_expand(prk, info, length):
-    """RFC 5869 HKDF-Expand"""
+    """RFC 5869 HKDF-Expand. prk may be bytes or a prepared HMACKey."""
     n = (length + 31) // 32
-    t, okm = b"", b""
+    if n > 255:
+        raise ValueError("HKDF output too long")
+    mac = prk.mac if isinstance(prk, HMACKey) else HMACKey(prk).mac
+    t, okm = b"", bytearray()
     for i in range(1, n + 1):
-        t = hmac_sha256(prk, t + info + bytes([i]))
+        t = mac(t, info, bytes((i,)))
         okm += t
-    return okm[:length]
+    return bytes(okm[:length])
 
 def hkdf(ikm, salt, info, length):
     prk = hkdf_extract(salt, ikm)
@@ -83,12 +130,41 @@ def hkdf(ikm, salt, info, length):
 ############################
 # Miller-Rabin Primality   #
 ############################
+def _small_primes(limit):
+    """Sieve of Eratosthenes: all primes below limit."""
+    sieve = bytearray([1]) * limit
+    sieve[0:2] = b"\x00\x00"
+    for i in range(2, int(limit ** 0.5) + 1):
+        if sieve[i]:
+            sieve[i*i::i] = bytes(len(range(i*i, limit, i)))
+    return [i for i, v in enumerate(sieve) if v]
+
+SMALL_PRIMES = _small_primes(20000)  # first 2262 primes, used to sieve candidates
+_PRIMORIAL = 1  # product of all primes < 1000
+for _p in SMALL_PRIMES:
+    if _p >= 1000:
+        break
+    _PRIMORIAL *= _p
+del _p
+
+def mr_rounds(bits):
+    """Miller-Rabin rounds for random candidates of this size (FIPS 186-4, Table C.3)."""
+    if bits >= 1536:
+        return 4
+    if bits >= 1024:
+        return 5
+    if bits >= 512:
+        return 7
+    return 40
+
 def is_probable_prime(n, k=8):
     """Miller-Rabin primality test."""
     if n < 2: return False
-    for p in [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47]:
-        if n % p == 0:
-            return n == p
+    if n < 1000:
+        return n in SMALL_PRIMES
+    # One gcd against the product of all primes < 1000 replaces trial division
+    if math.gcd(n, _PRIMORIAL) != 1:
+        return False
     s, d = 0, n - 1
     while d % 2 == 0:
         s += 1
@@ -106,11 +182,33 @@ def is_probable_prime(n, k=8):
             return False
     return True
 
-def gen_prime(bits):
+def gen_prime(bits, window=4096):
+    """
+    Random prime of exactly `bits` bits by incremental sieve search:
+    pick a random odd start, strike out multiples of SMALL_PRIMES from the next
+    `window` odd numbers and Miller-Rabin test only the survivors.
+    """
+    if bits < 32:
+        while True:
+            candidate = secrets.randbits(bits) | (1 << (bits-1)) | 1
+            if is_probable_prime(candidate, mr_rounds(bits)):
+                return candidate
+    rounds = mr_rounds(bits)
+    top = 1 << bits
     while True:
-        candidate = secrets.randbits(bits) | (1 << (bits-1)) | 1
-        if is_probable_prime(candidate):
-            return candidate
+        start = secrets.randbits(bits) | (1 << (bits-1)) | 1
+        # sieve[i] stands for start + 2*i
+        sieve = bytearray([1]) * window
+        for p in SMALL_PRIMES[1:]:
+            i = (-(start % p) * ((p + 1) // 2)) % p
+            sieve[i::p] = bytes(len(range(i, window, p)))
+        for i in range(window):
+            if sieve[i]:
+                candidate = start + 2 * i
+                if candidate >= top:
+                    break
+                if is_probable_prime(candidate, rounds):
+                    return candidate
 
 #################
 # AES-256 Block #
@@ -234,7 +332,7 @@ class AES256:
         return res
 
     def _bytes2state(self, block):
-        return [[block[i + 4 * j] for i in range(4)] for j in range(4)]
+        return [[block[j + 4 * i] for i in range(4)] for j in range(4)]
 
     def _state2bytes(self, state):
         return bytes(state[j][i] for i in range(4) for j in range(4))
@@ -267,53 +365,476 @@ class AES256:
         self._add_round_key(state, 0)
         return self._state2bytes(state)
 
+    def encrypt_words(self, s0, s1, s2, s3):
+        """Encrypts one block given as four big-endian 32-bit words."""
+        return struct.unpack('>4I', self.encrypt_block(struct.pack('>4I', s0, s1, s2, s3)))
+
+    def decrypt_words(self, s0, s1, s2, s3):
+        """Decrypts one block given as four big-endian 32-bit words."""
+        return struct.unpack('>4I', self.decrypt_block(struct.pack('>4I', s0, s1, s2, s3)))
+
+###########################
+# AES-256 T-table Engine  #
+###########################
+def _build_aes_ttables():
+    """Builds the 32-bit encryption (Te0..Te3) and decryption (Td0..Td3) tables."""
+    sbox, inv_sbox, mul = AES256.Sbox, AES256.InvSbox, AES256._mul
+    te0, td0 = [], []
+    for x in range(256):
+        s = sbox[x]
+        te0.append((mul(s, 2) << 24) | (s << 16) | (s << 8) | mul(s, 3))
+        i = inv_sbox[x]
+        td0.append((mul(i, 14) << 24) | (mul(i, 9) << 16) | (mul(i, 13) << 8) | mul(i, 11))
+    ror8 = lambda w: ((w >> 8) | (w << 24)) & 0xffffffff
+    te1 = [ror8(w) for w in te0]
+    te2 = [ror8(w) for w in te1]
+    te3 = [ror8(w) for w in te2]
+    td1 = [ror8(w) for w in td0]
+    td2 = [ror8(w) for w in td1]
+    td3 = [ror8(w) for w in td2]
+    return te0, te1, te2, te3, td0, td1, td2, td3
+
+class AES256TTable(AES256):
+    """
+    AES-256 using 32-bit T-tables and a word-based state.
+    Each round is 16 table lookups + XORs; decryption uses the equivalent
+    inverse cipher with a precomputed (InvMixColumns'd) key schedule.
+    Output is bit-identical to the reference AES256 class.
+    """
+    Te0, Te1, Te2, Te3, Td0, Td1, Td2, Td3 = _build_aes_ttables()
+
+    def __init__(self, key):
+        super().__init__(key)
+        self._dw = self._decryption_schedule(self._w)
+
+    def _decryption_schedule(self, w):
+        """Reverses the round keys and applies InvMixColumns to rounds 1..13."""
+        sbox = self.Sbox
+        td0, td1, td2, td3 = self.Td0, self.Td1, self.Td2, self.Td3
+        dw = []
+        for rnd in range(14, -1, -1):
+            for k in w[rnd * 4:rnd * 4 + 4]:
+                if 0 < rnd < 14:
+                    k = (td0[sbox[k >> 24]] ^ td1[sbox[(k >> 16) & 0xff]] ^
+                         td2[sbox[(k >> 8) & 0xff]] ^ td3[sbox[k & 0xff]])
+                dw.append(k)
+        return dw
+
+    def encrypt_words(self, s0, s1, s2, s3):
+        """Encrypts one block given as four big-endian 32-bit words."""
+        te0, te1, te2, te3 = self.Te0, self.Te1, self.Te2, self.Te3
+        w = self._w
+        s0 ^= w[0]; s1 ^= w[1]; s2 ^= w[2]; s3 ^= w[3]
+        for r in range(4, 56, 4):
+            t0 = te0[s0 >> 24] ^ te1[(s1 >> 16) & 0xff] ^ te2[(s2 >> 8) & 0xff] ^ te3[s3 & 0xff] ^ w[r]
+            t1 = te0[s1 >> 24] ^ te1[(s2 >> 16) & 0xff] ^ te2[(s3 >> 8) & 0xff] ^ te3[s0 & 0xff] ^ w[r + 1]
+            t2 = te0[s2 >> 24] ^ te1[(s3 >> 16) & 0xff] ^ te2[(s0 >> 8) & 0xff] ^ te3[s1 & 0xff] ^ w[r + 2]
+            t3 = te0[s3 >> 24] ^ te1[(s0 >> 16) & 0xff] ^ te2[(s1 >> 8) & 0xff] ^ te3[s2 & 0xff] ^ w[r + 3]
+            s0, s1, s2, s3 = t0, t1, t2, t3
+        sb = self.Sbox
+        return (
+            ((sb[s0 >> 24] << 24) | (sb[(s1 >> 16) & 0xff] << 16) | (sb[(s2 >> 8) & 0xff] << 8) | sb[s3 & 0xff]) ^ w[56],
+            ((sb[s1 >> 24] << 24) | (sb[(s2 >> 16) & 0xff] << 16) | (sb[(s3 >> 8) & 0xff] << 8) | sb[s0 & 0xff]) ^ w[57],
+            ((sb[s2 >> 24] << 24) | (sb[(s3 >> 16) & 0xff] << 16) | (sb[(s0 >> 8) & 0xff] << 8) | sb[s1 & 0xff]) ^ w[58],
+            ((sb[s3 >> 24] << 24) | (sb[(s0 >> 16) & 0xff] << 16) | (sb[(s1 >> 8) & 0xff] << 8) | sb[s2 & 0xff]) ^ w[59],
+        )
+
+    def decrypt_words(self, s0, s1, s2, s3):
+        """Decrypts one block given as four big-endian 32-bit words."""
+        td0, td1, td2, td3 = self.Td0, self.Td1, self.Td2, self.Td3
+        w = self._dw
+        s0 ^= w[0]; s1 ^= w[1]; s2 ^= w[2]; s3 ^= w[3]
+        for r in range(4, 56, 4):
+            t0 = td0[s0 >> 24] ^ td1[(s3 >> 16) & 0xff] ^ td2[(s2 >> 8) & 0xff] ^ td3[s1 & 0xff] ^ w[r]
+            t1 = td0[s1 >> 24] ^ td1[(s0 >> 16) & 0xff] ^ td2[(s3 >> 8) & 0xff] ^ td3[s2 & 0xff] ^ w[r + 1]
+            t2 = td0[s2 >> 24] ^ td1[(s1 >> 16) & 0xff] ^ td2[(s0 >> 8) & 0xff] ^ td3[s3 & 0xff] ^ w[r + 2]
+            t3 = td0[s3 >> 24] ^ td1[(s2 >> 16) & 0xff] ^ td2[(s1 >> 8) & 0xff] ^ td3[s0 & 0xff] ^ w[r + 3]
+            s0, s1, s2, s3 = t0, t1, t2, t3
+        ib = self.InvSbox
+        return (
+            ((ib[s0 >> 24] << 24) | (ib[(s3 >> 16) & 0xff] << 16) | (ib[(s2 >> 8) & 0xff] << 8) | ib[s1 & 0xff]) ^ w[56],
+            ((ib[s1 >> 24] << 24) | (ib[(s0 >> 16) & 0xff] << 16) | (ib[(s3 >> 8) & 0xff] << 8) | ib[s2 & 0xff]) ^ w[57],
+            ((ib[s2 >> 24] << 24) | (ib[(s1 >> 16) & 0xff] << 16) | (ib[(s0 >> 8) & 0xff] << 8) | ib[s3 & 0xff]) ^ w[58],
+            ((ib[s3 >> 24] << 24) | (ib[(s2 >> 16) & 0xff] << 16) | (ib[(s1 >> 8) & 0xff] << 8) | ib[s0 & 0xff]) ^ w[59],
+        )
+
+    def encrypt_block(self, block):
+        """Encrypts a single 16-byte block."""
+        return struct.pack('>4I', *self.encrypt_words(*struct.unpack('>4I', block)))
+
+    def decrypt_block(self, block):
+        """Decrypts a single 16-byte block."""
+        return struct.pack('>4I', *self.decrypt_words(*struct.unpack('>4I', block)))
+
+# Selectable block cipher engines; both produce identical output.
+AES_ENGINES = {
+    'reference': AES256,
+    'ttable': AES256TTable,
+}
+DEFAULT_AES_ENGINE = 'ttable'
+
+def get_aes_engine(engine=None):
+    """Returns the AES-256 class for an engine name (or class); None selects the default."""
+    if engine is None:
+        engine = DEFAULT_AES_ENGINE
+    if isinstance(engine, type):
+        return engine
+    try:
+        return AES_ENGINES[engine]
+    except KeyError:
+        raise ValueError("Unknown AES engine: %r" % (engine,))
+
 ##############################
 # AES-256-IGE Mode Encryptor #
 ##############################
-def aes_ige_encrypt(key, iv, data):
-    """AES-256-IGE encryption. IV must be 32 bytes (IV1 + IV2)."""
+def _ige_check(key, iv):
     if len(iv) != 32 or len(key) != 32:
         raise ValueError('Invalid key/IV length')
-    aes = AES256(key)
+
+def _ige_encrypt_words(aes, iv, data, n, out, out_off=0, in_off=0):
+    """
+    IGE-encrypts n bytes (multiple of 16) of data[in_off:] into out[out_off:].
+    Chaining state (C_prev, P_prev) is kept as 32-bit word integers and each
+    block is read/written with struct *_from/_into, so no per-block bytes objects.
+    Returns the updated chaining state packed as a 32-byte IV (C_prev + P_prev).
+    """
+    unpack_from, pack_into = struct.unpack_from, struct.pack_into
+    encrypt_words = aes.encrypt_words
+    c0, c1, c2, c3, q0, q1, q2, q3 = unpack_from('>8I', iv)
+    for off in range(0, n, 16):
+        p0, p1, p2, p3 = unpack_from('>4I', data, in_off + off)
+        e0, e1, e2, e3 = encrypt_words(p0 ^ c0, p1 ^ c1, p2 ^ c2, p3 ^ c3)
+        c0, c1, c2, c3 = e0 ^ q0, e1 ^ q1, e2 ^ q2, e3 ^ q3
+        pack_into('>4I', out, out_off + off, c0, c1, c2, c3)
+        q0, q1, q2, q3 = p0, p1, p2, p3
+    return struct.pack('>8I', c0, c1, c2, c3, q0, q1, q2, q3)
+
+def _ige_decrypt_words(aes, iv, data, n, out, out_off=0, in_off=0):
+    """Inverse of _ige_encrypt_words (same chaining/IV layout)."""
+    unpack_from, pack_into = struct.unpack_from, struct.pack_into
+    decrypt_words = aes.decrypt_words
+    c0, c1, c2, c3, q0, q1, q2, q3 = unpack_from('>8I', iv)
+    for off in range(0, n, 16):
+        x0, x1, x2, x3 = unpack_from('>4I', data, in_off + off)
+        d0, d1, d2, d3 = decrypt_words(x0 ^ q0, x1 ^ q1, x2 ^ q2, x3 ^ q3)
+        q0, q1, q2, q3 = d0 ^ c0, d1 ^ c1, d2 ^ c2, d3 ^ c3
+        pack_into('>4I', out, out_off + off, q0, q1, q2, q3)
+        c0, c1, c2, c3 = x0, x1, x2, x3
+    return struct.pack('>8I', c0, c1, c2, c3, q0, q1, q2, q3)
+
+def aes_ige_encrypt_into(key, iv, data, out, engine=None):
+    """
+    AES-256-IGE encryption into a preallocated writable buffer (bytearray/memoryview).
+    out must hold len(data) rounded up to 16 bytes. Returns the number of bytes written.
+    """
+    _ige_check(key, iv)
+    aes = get_aes_engine(engine)(key)
+    n_full = len(data) - len(data) % 16
+    total = n_full if n_full == len(data) else n_full + 16
+    if len(out) < total:
+        raise ValueError('Output buffer too small')
+    state = _ige_encrypt_words(aes, iv, data, n_full, out)
+    if total != n_full:
+        tail = pad_pkcs7(bytes(data[n_full:]), 16)
+        _ige_encrypt_words(aes, state, tail, 16, out, n_full)
+    return total
+
+def aes_ige_decrypt_into(key, iv, data, out, engine=None):
+    """AES-256-IGE decryption into a preallocated writable buffer. Returns bytes written."""
+    _ige_check(key, iv)
     if len(data) % 16 != 0:
-        data = pad_pkcs7(data, 16)
-    blocks = [data[i:i+16] for i in range(0, len(data), 16)]
-    C_prev = iv[:16]
-    P_prev = iv[16:]
-    out = []
-    for P in blocks:
-        xored = xor_bytes(P, C_prev)
-        enc = aes.encrypt_block(xored)
-        C = xor_bytes(enc, P_prev)
-        out.append(C)
-        C_prev, P_prev = C, P
-    return b''.join(out)
-
-def aes_ige_decrypt(key, iv, data):
-    if len(iv) != 32 or len(key) != 32:
-        raise ValueError('Invalid key/IV length')
-    aes = AES256(key)
-    blocks = [data[i:i+16] for i in range(0, len(data), 16)]
-    C_prev = iv[:16]
-    P_prev = iv[16:]
-    out = []
-    for C in blocks:
-        xored = xor_bytes(C, P_prev)
-        dec = aes.decrypt_block(xored)
-        P = xor_bytes(dec, C_prev)
-        out.append(P)
-        C_prev, P_prev = C, P
-    return b''.join(out)
+        raise ValueError('Ciphertext length must be a multiple of 16')
+    if len(out) < len(data):
+        raise ValueError('Output buffer too small')
+    aes = get_aes_engine(engine)(key)
+    _ige_decrypt_words(aes, iv, data, len(data), out)
+    return len(data)
+
+def aes_ige_encrypt(key, iv, data, engine=None):
+    """AES-256-IGE encryption. IV must be 32 bytes (IV1 + IV2)."""
+    out = bytearray((len(data) + 15) // 16 * 16)
+    aes_ige_encrypt_into(key, iv, data, out, engine)
+    return bytes(out)
+
+def aes_ige_decrypt(key, iv, data, engine=None):
+    out = bytearray(len(data))
+    aes_ige_decrypt_into(key, iv, data, out, engine)
+    return bytes(out)
+
+###############################
+# Streaming AES-IGE (chunked) #
+###############################
+class IGEEncryptor:
+    """
+    Incremental AES-256-IGE encryption.
+    Feed bytes/memoryview chunks to update(); each call returns the ciphertext for
+    the complete blocks seen so far and keeps at most 15 bytes of carry.
+    finalize() applies PKCS#7 padding (always a full pad block, so the stream can be
+    unpadded by IGEDecryptor) and returns the last ciphertext block.
+    With padding=False the total input must be a multiple of 16 bytes.
+    """
+    def __init__(self, key, iv, engine=None, padding=True):
+        _ige_check(key, iv)
+        self._aes = get_aes_engine(engine)(key)
+        self._state = bytes(iv)
+        self._carry = bytearray()
+        self._padding = padding
+        self._done = False
+
+    def update(self, chunk):
+        if self._done:
+            raise ValueError('update() called after finalize()')
+        mv = memoryview(chunk).cast('B')
+        carry = self._carry
+        out = bytearray((len(carry) + len(mv)) // 16 * 16)
+        written = 0
+        if carry:
+            need = 16 - len(carry)
+            carry += mv[:need]
+            mv = mv[need:]
+            if len(carry) < 16:
+                return b''
+            self._state = _ige_encrypt_words(self._aes, self._state, carry, 16, out)
+            carry.clear()
+            written = 16
+        n = len(mv) - len(mv) % 16
+        if n:
+            self._state = _ige_encrypt_words(self._aes, self._state, mv, n, out, written)
+        carry += mv[n:]
+        return bytes(out)
+
+    def finalize(self):
+        if self._done:
+            raise ValueError('finalize() called twice')
+        self._done = True
+        if not self._padding:
+            if self._carry:
+                raise ValueError('Data length must be a multiple of 16 without padding')
+            return b''
+        out = bytearray(16)
+        _ige_encrypt_words(self._aes, self._state, pad_pkcs7(bytes(self._carry), 16), 16, out)
+        self._carry.clear()
+        return bytes(out)
+
+class IGEDecryptor:
+    """
+    Incremental AES-256-IGE decryption (counterpart of IGEEncryptor).
+    The last decrypted block is held back until finalize(), which strips PKCS#7 padding.
+    """
+    def __init__(self, key, iv, engine=None, padding=True):
+        _ige_check(key, iv)
+        self._aes = get_aes_engine(engine)(key)
+        self._state = bytes(iv)
+        self._carry = bytearray()
+        self._pending = b''
+        self._padding = padding
+        self._done = False
+
+    def update(self, chunk):
+        if self._done:
+            raise ValueError('update() called after finalize()')
+        mv = memoryview(chunk).cast('B')
+        carry = self._carry
+        pending = self._pending
+        out = bytearray(len(pending) + (len(carry) + len(mv)) // 16 * 16)
+        out[:len(pending)] = pending
+        written = len(pending)
+        if carry:
+            need = 16 - len(carry)
+            carry += mv[:need]
+            mv = mv[need:]
+            if len(carry) < 16:
+                return b''
+            self._state = _ige_decrypt_words(self._aes, self._state, carry, 16, out, written)
+            carry.clear()
+            written += 16
+        n = len(mv) - len(mv) % 16
+        if n:
+            self._state = _ige_decrypt_words(self._aes, self._state, mv, n, out, written)
+        carry += mv[n:]
+        if not self._padding:
+            self._pending = b''
+            return bytes(out)
+        # Hold back the final block: it may carry the padding
+        self._pending = bytes(out[-16:]) if out else b''
+        return bytes(out[:-16])
+
+    def finalize(self):
+        if self._done:
+            raise ValueError('finalize() called twice')
+        self._done = True
+        if self._carry:
+            raise ValueError('Ciphertext length must be a multiple of 16')
+        if not self._padding:
+            return b''
+        if not self._pending:
+            raise ValueError('Invalid PKCS#7 padding')
+        pending, self._pending = self._pending, b''
+        return unpad_pkcs7(pending)
+
+##################################
+# Batched AES-IGE (NumPy lanes)  #
+##################################
+_NP_TABLES = None
+
+def _np_aes_tables():
+    """Lazily converts the T-tables and S-boxes to uint32 NumPy arrays."""
+    global _NP_TABLES
+    if _NP_TABLES is None:
+        t = AES256TTable
+        _NP_TABLES = tuple(np.array(x, dtype=np.uint32) for x in (
+            t.Te0, t.Te1, t.Te2, t.Te3, t.Sbox,
+            t.Td0, t.Td1, t.Td2, t.Td3, t.InvSbox))
+    return _NP_TABLES
+
+def _np_encrypt_lanes(rk, s0, s1, s2, s3):
+    """Encrypts one block per lane; rk is (lanes, 60) uint32, s* are (lanes,) uint32."""
+    te0, te1, te2, te3, sb = _np_aes_tables()[:5]
+    s0 = s0 ^ rk[:, 0]; s1 = s1 ^ rk[:, 1]; s2 = s2 ^ rk[:, 2]; s3 = s3 ^ rk[:, 3]
+    for r in range(4, 56, 4):
+        t0 = te0[s0 >> 24] ^ te1[(s1 >> 16) & 0xff] ^ te2[(s2 >> 8) & 0xff] ^ te3[s3 & 0xff] ^ rk[:, r]
+        t1 = te0[s1 >> 24] ^ te1[(s2 >> 16) & 0xff] ^ te2[(s3 >> 8) & 0xff] ^ te3[s0 & 0xff] ^ rk[:, r + 1]
+        t2 = te0[s2 >> 24] ^ te1[(s3 >> 16) & 0xff] ^ te2[(s0 >> 8) & 0xff] ^ te3[s1 & 0xff] ^ rk[:, r + 2]
+        t3 = te0[s3 >> 24] ^ te1[(s0 >> 16) & 0xff] ^ te2[(s1 >> 8) & 0xff] ^ te3[s2 & 0xff] ^ rk[:, r + 3]
+        s0, s1, s2, s3 = t0, t1, t2, t3
+    return (
+        ((sb[s0 >> 24] << 24) | (sb[(s1 >> 16) & 0xff] << 16) | (sb[(s2 >> 8) & 0xff] << 8) | sb[s3 & 0xff]) ^ rk[:, 56],
+        ((sb[s1 >> 24] << 24) | (sb[(s2 >> 16) & 0xff] << 16) | (sb[(s3 >> 8) & 0xff] << 8) | sb[s0 & 0xff]) ^ rk[:, 57],
+        ((sb[s2 >> 24] << 24) | (sb[(s3 >> 16) & 0xff] << 16) | (sb[(s0 >> 8) & 0xff] << 8) | sb[s1 & 0xff]) ^ rk[:, 58],
+        ((sb[s3 >> 24] << 24) | (sb[(s0 >> 16) & 0xff] << 16) | (sb[(s1 >> 8) & 0xff] << 8) | sb[s2 & 0xff]) ^ rk[:, 59],
+    )
+
+def _np_decrypt_lanes(rk, s0, s1, s2, s3):
+    """Decrypts one block per lane with equivalent-inverse-cipher round keys."""
+    td0, td1, td2, td3, ib = _np_aes_tables()[5:]
+    s0 = s0 ^ rk[:, 0]; s1 = s1 ^ rk[:, 1]; s2 = s2 ^ rk[:, 2]; s3 = s3 ^ rk[:, 3]
+    for r in range(4, 56, 4):
+        t0 = td0[s0 >> 24] ^ td1[(s3 >> 16) & 0xff] ^ td2[(s2 >> 8) & 0xff] ^ td3[s1 & 0xff] ^ rk[:, r]
+        t1 = td0[s1 >> 24] ^ td1[(s0 >> 16) & 0xff] ^ td2[(s3 >> 8) & 0xff] ^ td3[s2 & 0xff] ^ rk[:, r + 1]
+        t2 = td0[s2 >> 24] ^ td1[(s1 >> 16) & 0xff] ^ td2[(s0 >> 8) & 0xff] ^ td3[s3 & 0xff] ^ rk[:, r + 2]
+        t3 = td0[s3 >> 24] ^ td1[(s2 >> 16) & 0xff] ^ td2[(s1 >> 8) & 0xff] ^ td3[s0 & 0xff] ^ rk[:, r + 3]
+        s0, s1, s2, s3 = t0, t1, t2, t3
+    return (
+        ((ib[s0 >> 24] << 24) | (ib[(s3 >> 16) & 0xff] << 16) | (ib[(s2 >> 8) & 0xff] << 8) | ib[s1 & 0xff]) ^ rk[:, 56],
+        ((ib[s1 >> 24] << 24) | (ib[(s0 >> 16) & 0xff] << 16) | (ib[(s3 >> 8) & 0xff] << 8) | ib[s2 & 0xff]) ^ rk[:, 57],
+        ((ib[s2 >> 24] << 24) | (ib[(s1 >> 16) & 0xff] << 16) | (ib[(s0 >> 8) & 0xff] << 8) | ib[s3 & 0xff]) ^ rk[:, 58],
+        ((ib[s3 >> 24] << 24) | (ib[(s2 >> 16) & 0xff] << 16) | (ib[(s1 >> 8) & 0xff] << 8) | ib[s0 & 0xff]) ^ rk[:, 59],
+    )
+
+def _np_ige_many(keys, ivs, datas, decrypt):
+    """
+    Runs IGE for N independent messages side by side, one NumPy lane per message.
+    Lanes are ordered by block count (longest first) so the set of lanes whose
+    message is still running is always a prefix; finished lanes are masked off.
+    """
+    n = len(datas)
+    nblocks = [len(d) // 16 for d in datas]
+    order = sorted(range(n), key=lambda i: -nblocks[i])
+    lens = np.array([nblocks[i] for i in order], dtype=np.int64)
+    max_b = int(lens[0]) if n else 0
+    buf = bytearray(n * max_b * 16)
+    for lane, i in enumerate(order):
+        buf[lane * max_b * 16:lane * max_b * 16 + len(datas[i])] = datas[i]
+    src = np.frombuffer(bytes(buf), dtype='>u4').astype(np.uint32).reshape(n, max_b, 4)
+    dst = np.zeros_like(src)
+    engines = [AES256TTable(keys[i]) for i in order]
+    rk = np.array([e._dw if decrypt else e._w for e in engines], dtype=np.uint32).reshape(n, 60)
+    iv = np.frombuffer(b''.join(bytes(ivs[i]) for i in order), dtype='>u4').astype(np.uint32).reshape(n, 8)
+    # x_prev: previous input-side block, y_prev: previous output-side block
+    if decrypt:
+        x_prev, y_prev = iv[:, 0:4].copy(), iv[:, 4:8].copy()
+        rounds = _np_decrypt_lanes
+    else:
+        x_prev, y_prev = iv[:, 4:8].copy(), iv[:, 0:4].copy()
+        rounds = _np_encrypt_lanes
+    for b in range(max_b):
+        active = int(np.count_nonzero(lens > b))
+        x = src[:active, b]
+        yp, xp = y_prev[:active], x_prev[:active]
+        r = rounds(rk[:active], x[:, 0] ^ yp[:, 0], x[:, 1] ^ yp[:, 1], x[:, 2] ^ yp[:, 2], x[:, 3] ^ yp[:, 3])
+        y = np.stack(r, axis=1) ^ xp
+        dst[:active, b] = y
+        y_prev[:active] = y
+        x_prev[:active] = x
+    raw = dst.astype('>u4').tobytes()
+    out = [None] * n
+    for lane, i in enumerate(order):
+        off = lane * max_b * 16
+        out[i] = raw[off:off + nblocks[i] * 16]
+    return out
+
+# Below this many lanes per bucket the per-call NumPy overhead outweighs the
+# vectorized rounds and the scalar T-table path is faster (see bench.py)
+_NP_MIN_LANES = 64
+
+def _np_buckets(nblocks):
+    """
+    Groups message indices into buckets whose block counts are within a factor
+    of two, so a bucket pads each lane by at most 2x and its tail (where only
+    the longest lanes are still running) stays short. Buckets smaller than
+    _NP_MIN_LANES are returned separately for the scalar path.
+    """
+    order = sorted(range(len(nblocks)), key=nblocks.__getitem__)
+    buckets, scalar, i = [], [], 0
+    while i < len(order):
+        j = i
+        limit = 2 * max(1, nblocks[order[i]])
+        while j < len(order) and nblocks[order[j]] <= limit:
+            j += 1
+        group = order[i:j]
+        (buckets if len(group) >= _NP_MIN_LANES else scalar).append(group)
+        i = j
+    return buckets, [k for group in scalar for k in group]
+
+def _ige_many(keys, ivs, datas, decrypt):
+    if not (len(keys) == len(ivs) == len(datas)):
+        raise ValueError('keys, ivs and datas must have the same length')
+    for key, iv in zip(keys, ivs):
+        _ige_check(key, iv)
+    if decrypt:
+        if any(len(d) % 16 for d in datas):
+            raise ValueError('Ciphertext length must be a multiple of 16')
+    else:
+        datas = [d if len(d) % 16 == 0 else pad_pkcs7(bytes(d), 16) for d in datas]
+    single = aes_ige_decrypt if decrypt else aes_ige_encrypt
+    if np is None or len(datas) < _NP_MIN_LANES:
+        return [single(k, iv, d) for k, iv, d in zip(keys, ivs, datas)]
+    out = [None] * len(datas)
+    buckets, scalar = _np_buckets([len(d) // 16 for d in datas])
+    for group in buckets:
+        results = _np_ige_many([keys[i] for i in group], [ivs[i] for i in group],
+                               [datas[i] for i in group], decrypt)
+        for i, result in zip(group, results):
+            out[i] = result
+    for i in scalar:
+        out[i] = single(keys[i], ivs[i], datas[i])
+    return out
+
+def aes_ige_encrypt_many(keys, ivs, datas):
+    """
+    AES-256-IGE encryption of many independent messages at once.
+    When NumPy is available, messages of similar length are grouped and each
+    group of at least _NP_MIN_LANES messages runs as vectorized NumPy lanes; the
+    rest take the scalar path. Output is byte-identical to aes_ige_encrypt per message.
+    """
+    return _ige_many(keys, ivs, datas, decrypt=False)
+
+def aes_ige_decrypt_many(keys, ivs, datas):
+    """Batched counterpart of aes_ige_decrypt (see aes_ige_encrypt_many)."""
+    return _ige_many(keys, ivs, datas, decrypt=True)
 
 ######################
 # RSA-2048           #
 ######################
 def egcd(a, b):
-    if b == 0:
-        return (1, 0, a)
-    else:
-        y, x, g = egcd(b, a % b)
-        return (x, y - (a // b) * x, g)
+    # Iterative extended Euclid: returns (x, y, g) with a*x + b*y = g
+    x0, y0, x1, y1 = 1, 0, 0, 1
+    while b:
+        q, r = divmod(a, b)
+        a, b = b, r
+        x0, x1 = x1, x0 - q * x1
+        y0, y1 = y1, y0 - q * y1
+    return (x0, y0, a)
 
 def modinv(a, m):
     x, y, g = egcd(a, m)
@@ -322,16 +843,29 @@ def modinv(a, m):
     return x % m
 
 class RSAKey:
-    """Manual RSA-2048 key pair."""
-    def __init__(self, n, e, d=None, p=None, q=None):
+    """
+    Manual RSA-2048 key pair.
+    Private keys that know p and q decrypt via the CRT (dp, dq, qinv are derived at
+    construction if not given). With blinding=True the ciphertext is multiplied by a
+    random r^e before the private operation so its timing does not depend on c.
+    """
+    def __init__(self, n, e, d=None, p=None, q=None, dp=None, dq=None, qinv=None, blinding=False):
         self.n = n
         self.e = e
         self.d = d
         self.p = p
         self.q = q
+        if d is not None and p is not None and q is not None:
+            self.dp = d % (p - 1) if dp is None else dp
+            self.dq = d % (q - 1) if dq is None else dq
+            self.qinv = modinv(q, p) if qinv is None else qinv
+        else:
+            self.dp = self.dq = self.qinv = None
+        self.blinding = blinding
+        self._blind = None  # (r^e mod n, r^-1 mod n), refreshed by squaring
 
     @staticmethod
-    def generate(bits=2048, e=65537):
+    def generate(bits=2048, e=65537, blinding=False):
         while True:
             p = gen_prime(bits // 2)
             q = gen_prime(bits // 2)
@@ -340,25 +874,59 @@ class RSAKey:
         n = p * q
         phi = (p - 1) * (q - 1)
         d = modinv(e, phi)
-        return RSAKey(n, e, d, p, q)
+        return RSAKey(n, e, d, p, q, blinding=blinding)
+
+    @staticmethod
+    def import_private(fields, blinding=False):
+        """Loads a key from export_private() output (5-tuple without CRT values also accepted)."""
+        e, n = fields[0], fields[1]
+        return RSAKey(n, e, *fields[2:], blinding=blinding)
 
     def encrypt(self, m):
         return pow(m, self.e, self.n)
 
+    def _decrypt_crt(self, c):
+        p, q = self.p, self.q
+        m1 = pow(c % p, self.dp, p)
+        m2 = pow(c % q, self.dq, q)
+        h = (self.qinv * (m1 - m2)) % p
+        return m2 + h * q
+
+    def _blinding_factors(self):
+        n = self.n
+        if self._blind is None:
+            while True:
+                r = secrets.randbelow(n - 2) + 2
+                if math.gcd(r, n) == 1:
+                    break
+            self._blind = (pow(r, self.e, n), modinv(r, n))
+        else:
+            vi, vf = self._blind
+            self._blind = (vi * vi % n, vf * vf % n)
+        return self._blind
+
     def decrypt(self, c):
         if self.d is None:
             raise ValueError("No private exponent in this key")
-        return pow(c, self.d, self.n)
-
-    def pkcs1v15_pad(self, msg, klen):
-        """PKCS#1 v1.5 type 2 padding for encryption (for up to klen-11 bytes)"""
+        if self.dp is None:
+            return pow(c, self.d, self.n)
+        if not self.blinding:
+            return self._decrypt_crt(c)
+        vi, vf = self._blinding_factors()
+        return (self._decrypt_crt(c * vi % self.n) * vf) % self.n
+
+    def pkcs1v15_pad(self, msg, klen, ps=None):
+        """
+        PKCS#1 v1.5 type 2 padding for encryption (for up to klen-11 bytes).
+        ps (the non-zero random padding string) may be supplied by bulk callers.
+        """
         if len(msg) > klen - 11:
             raise ValueError("Message too long")
-        ps = b""
-        while len(ps) < klen - len(msg) - 3:
-            b = secrets.token_bytes(1)
-            if b != b"\x00":
-                ps += b
+        ps_len = klen - len(msg) - 3
+        if ps is None:
+            ps = nonzero_random_bytes(ps_len)
+        elif len(ps) != ps_len or 0 in ps:
+            raise ValueError("Invalid padding string")
         return b"\x00\x02" + ps + b"\x00" + msg
 
     def pkcs1v15_unpad(self, em):
@@ -369,9 +937,9 @@ class RSAKey:
             raise ValueError("Incorrect padding")
         return em[idx+1:]
 
-    def encrypt_bytes(self, msg):
+    def encrypt_bytes(self, msg, ps=None):
         klen = (self.n.bit_length() + 7) // 8
-        em = self.pkcs1v15_pad(msg, klen)
+        em = self.pkcs1v15_pad(msg, klen, ps)
         m = bytes_to_int(em)
         c = self.encrypt(m)
         return int_to_bytes(c, klen)
@@ -387,7 +955,61 @@ class RSAKey:
         return (self.e, self.n)
 
     def export_private(self):
-        return (self.e, self.n, self.d, self.p, self.q)
+        return (self.e, self.n, self.d, self.p, self.q, self.dp, self.dq, self.qinv)
+
+def _rsa_pool_generate(bits, e):
+    """Process-pool job: returns export_private() of a fresh key."""
+    return RSAKey.generate(bits, e).export_private()
+
+class RSAKeyPool:
+    """
+    Keeps `size` RSA keys being pregenerated on a process pool.
+    get() hands out a finished key (each key exactly once) and immediately
+    schedules a replacement; if none is ready yet it waits for the oldest job.
+    """
+    def __init__(self, size=4, bits=2048, e=65537, workers=None):
+        self.bits = bits
+        self.e = e
+        self._executor = ProcessPoolExecutor(max_workers=workers)
+        self._lock = threading.Lock()
+        self._jobs = deque(self._submit() for _ in range(size))
+
+    def _submit(self):
+        return self._executor.submit(_rsa_pool_generate, self.bits, self.e)
+
+    def ready(self):
+        """Number of keys that can be handed out without waiting."""
+        with self._lock:
+            return sum(1 for f in self._jobs if f.done())
+
+    def get(self):
+        with self._lock:
+            job = next((f for f in self._jobs if f.done()), None)
+            if job is None:
+                job = self._jobs[0]
+            self._jobs.remove(job)
+            self._jobs.append(self._submit())
+        return RSAKey.import_private(job.result())
+
+    def close(self, wait=True):
+        with self._lock:
+            for f in self._jobs:
+                f.cancel()
+            self._jobs.clear()
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+_default_rsa_pool = None
+
+def set_rsa_key_pool(pool):
+    """Installs an RSAKeyPool used by generate_rsa_keypair() (None to disable)."""
+    global _default_rsa_pool
+    _default_rsa_pool = pool
 
 ##########################
 # Diffie-Hellman 2048bit #
@@ -403,15 +1025,69 @@ DH_PRIME_2048 = int(
     "D8115F635B105EE2E4E15D04B2454BF6F4FADF034B10403119CD8E3B92FCC5B", 16
 )
 DH_G = 2
+# Opt-in short private exponents: 2x the ~112-bit security level of a 2048-bit
+# group, rounded up to 256 bits (RFC 3526 / NIST SP 800-56A sizing)
+DH_SHORT_EXPONENT_BITS = 256
+
+class FixedBaseExp:
+    """
+    Fixed-base modular exponentiation with a precomputed window table:
+    table[i][j] = base^(j * 2^(window*i)) mod modulus, so base^x is one table
+    lookup and one modular multiplication per non-zero window of x (no squarings).
+    """
+    def __init__(self, base, modulus, window=5, bits=None):
+        self.base = base
+        self.modulus = modulus
+        self.window = window
+        self.bits = modulus.bit_length() if bits is None else bits
+        self._mask = (1 << window) - 1
+        self._table = []
+        b = base % modulus
+        for _ in range((self.bits + window - 1) // window):
+            row = [1] * (1 << window)
+            for j in range(1, 1 << window):
+                row[j] = row[j - 1] * b % modulus
+            self._table.append(row)
+            b = row[-1] * b % modulus
+        self._table = tuple(tuple(row) for row in self._table)
+
+    def pow(self, exponent):
+        if exponent < 0 or exponent.bit_length() > self.bits:
+            return pow(self.base, exponent, self.modulus)
+        m, mask, w = self.modulus, self._mask, self.window
+        r = 1
+        for row in self._table:
+            if not exponent:
+                break
+            d = exponent & mask
+            if d:
+                r = r * row[d] % m
+            exponent >>= w
+        return r
+
+_dh_fixed_base = None
+_dh_fixed_base_lock = threading.Lock()
+
+def dh_fixed_base():
+    """Returns the process-wide FixedBaseExp for DH_G mod DH_PRIME_2048 (built on first use)."""
+    global _dh_fixed_base
+    if _dh_fixed_base is None:
+        with _dh_fixed_base_lock:
+            if _dh_fixed_base is None:
+                _dh_fixed_base = FixedBaseExp(DH_G, DH_PRIME_2048)
+    return _dh_fixed_base
 
 class DHKeyPair:
     """Manual DH-2048 keypair."""
-    def __init__(self, private=None, public=None):
+    def __init__(self, private=None, public=None, short_exponent=False):
         if private is None:
-            self.private = secrets.randbits(2048) % (DH_PRIME_2048 - 2) + 2
+            if short_exponent:
+                self.private = secrets.randbits(DH_SHORT_EXPONENT_BITS) | (1 << (DH_SHORT_EXPONENT_BITS - 1))
+            else:
+                self.private = secrets.randbits(2048) % (DH_PRIME_2048 - 2) + 2
         else:
             self.private = private
-        self.public = pow(DH_G, self.private, DH_PRIME_2048) if public is None else public
+        self.public = dh_fixed_base().pow(self.private) if public is None else public
 
     def compute_shared(self, peer_public):
         if not (2 < peer_public < DH_PRIME_2048 - 2):
@@ -419,6 +1095,103 @@ class DHKeyPair:
         shared = pow(peer_public, self.private, DH_PRIME_2048)
         return int_to_bytes(shared, 256)  # 2048 bits = 256 bytes
 
+
+def _dh_pool_generate(count, short_exponent):
+    """Process-pool job: returns `count` fresh (private, public) pairs."""
+    return [(k.private, k.public) for k in (DHKeyPair(short_exponent=short_exponent) for _ in range(count))]
+
+class DHKeyPairPool:
+    """
+    Bounded queue of fresh, single-use ephemeral DH keypairs.
+    A background thread refills the queue up to `high` whenever it drops below
+    `low`; with workers > 0 the keypairs are generated on a process pool instead
+    of the refill thread. get() never blocks on the refill: an empty pool falls
+    back to generating on the caller's thread (counted as a miss).
+    """
+    def __init__(self, low=8, high=32, short_exponent=False, workers=0):
+        if not 0 <= low <= high or high < 1:
+            raise ValueError("Need 0 <= low <= high and high >= 1")
+        self.low = low
+        self.high = high
+        self.short_exponent = short_exponent
+        self.hits = 0
+        self.misses = 0
+        self._keys = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._executor = ProcessPoolExecutor(max_workers=workers) if workers else None
+        self._workers = workers
+        self._thread = threading.Thread(target=self._refill_loop, name="DHKeyPairPool", daemon=True)
+        self._thread.start()
+
+    def _generate(self, count):
+        if self._executor is None:
+            return [DHKeyPair(short_exponent=self.short_exponent) for _ in range(count)]
+        per_job = max(1, count // self._workers)
+        jobs = [self._executor.submit(_dh_pool_generate, min(per_job, count - i), self.short_exponent)
+                for i in range(0, count, per_job)]
+        return [DHKeyPair(priv, pub) for job in jobs for priv, pub in job.result()]
+
+    def _refill_loop(self):
+        while True:
+            with self._cond:
+                while not self._closed and len(self._keys) >= self.low and self._keys:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                missing = self.high - len(self._keys)
+            # Generate in small batches so fresh keys become available early
+            batch = self._workers or 1
+            while missing > 0:
+                fresh = self._generate(min(batch, missing))
+                with self._cond:
+                    if self._closed:
+                        return
+                    self._keys.extend(fresh)
+                    missing = self.high - len(self._keys)
+
+    def get(self):
+        """Returns a keypair that has never been handed out before."""
+        with self._cond:
+            if self._keys:
+                key = self._keys.popleft()
+                self.hits += 1
+            else:
+                key = None
+                self.misses += 1
+            if len(self._keys) < self.low or not self._keys:
+                self._cond.notify()
+        if key is None:
+            key = DHKeyPair(short_exponent=self.short_exponent)
+        return key
+
+    def stats(self):
+        with self._cond:
+            return {'size': len(self._keys), 'hits': self.hits, 'misses': self.misses,
+                    'low': self.low, 'high': self.high}
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._keys.clear()
+            self._cond.notify_all()
+        self._thread.join()
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+_default_dh_pool = None
+
+def set_dh_keypair_pool(pool):
+    """Installs a DHKeyPairPool used by generate_dh_keypair() (None to disable)."""
+    global _default_dh_pool
+    _default_dh_pool = pool
+
 #######################################
 # MTProto 2.0-like Session Management #
 #######################################
@@ -444,6 +1217,112 @@ def make_external_header(auth_key_id, msg_key):
 def make_internal_header(salt, session_id):
     return salt + session_id
 
+# MTProto-style msg_container: magic, count, then per item msg_id/seq_no/length/body
+CONTAINER_MAGIC = 0x73f1f8dc
+_CONTAINER_HDR = struct.Struct('<II')
+_CONTAINER_ITEM = struct.Struct('<QII')
+
+def pack_container(msgs, seq_nos=None, first_msg_id=None):
+    """Packs many msg_data items into one container body (each gets its own msg_id)."""
+    if first_msg_id is None:
+        first_msg_id = int(time.time() * (2**32))
+    out = bytearray(_CONTAINER_HDR.pack(CONTAINER_MAGIC, len(msgs)))
+    for i, msg_data in enumerate(msgs):
+        seq_no = 1 if seq_nos is None else seq_nos[i]
+        out += _CONTAINER_ITEM.pack(first_msg_id + 4 * i, seq_no, len(msg_data))
+        out += msg_data
+    return bytes(out)
+
+def _container_items(view, count, off):
+    for _ in range(count):
+        if off + _CONTAINER_ITEM.size > len(view):
+            raise ValueError("Truncated message container")
+        msg_id, seq_no, length = _CONTAINER_ITEM.unpack_from(view, off)
+        off += _CONTAINER_ITEM.size
+        if off + length > len(view):
+            raise ValueError("Truncated message container")
+        yield msg_id, seq_no, bytes(view[off:off + length])
+        off += length
+
+def iter_container(data):
+    """Checks the container header and returns a lazy iterator of (msg_id, seq_no, msg_data)."""
+    view = memoryview(data)
+    if len(view) < _CONTAINER_HDR.size:
+        raise ValueError("Not a message container")
+    magic, count = _CONTAINER_HDR.unpack_from(view, 0)
+    if magic != CONTAINER_MAGIC:
+        raise ValueError("Not a message container")
+    return _container_items(view, count, _CONTAINER_HDR.size)
+
+# Segmented IGE: the ciphertext is prefixed with an 8-byte segment header
+# (mode, segment size). Single-chain ciphertexts are always a multiple of 16
+# bytes, so len(payload) - 24 == 8 (mod 16) identifies the segmented format.
+SEGMENTED_IGE_MODE = 1
+_SEGMENT_HDR = struct.Struct('<BxxxI')
+
+def make_segment_header(segment_size):
+    if segment_size <= 0 or segment_size % 16:
+        raise ValueError("segment_size must be a positive multiple of 16")
+    return _SEGMENT_HDR.pack(SEGMENTED_IGE_MODE, segment_size)
+
+def parse_segment_header(seg_hdr):
+    """Returns the segment size of a segment header."""
+    mode, segment_size = _SEGMENT_HDR.unpack(seg_hdr)
+    if mode != SEGMENTED_IGE_MODE or segment_size <= 0 or segment_size % 16:
+        raise ValueError("Invalid segment header")
+    return segment_size
+
+def is_segmented(payload):
+    return (len(payload) - 24) % 16 == _SEGMENT_HDR.size
+
+def _segment_prk(aes_key, aes_iv, msg_key):
+    return HMACKey(hkdf_extract(msg_key, aes_key + aes_iv))
+
+def _segment_info(seg_hdr, index):
+    return b"rottikol-segment" + seg_hdr + struct.pack('<I', index)
+
+def segment_key_iv(aes_key, aes_iv, msg_key, seg_hdr, index):
+    """
+    Per-segment AES key and IV: HKDF over the message's secret aes_key/aes_iv,
+    salted with msg_key and bound to the segment header and index.
+    """
+    okm = hkdf_expand(_segment_prk(aes_key, aes_iv, msg_key), _segment_info(seg_hdr, index), 64)
+    return okm[:32], okm[32:]
+
+def _segment_job(job):
+    key, iv, data, decrypt = job
+    return aes_ige_decrypt(key, iv, data) if decrypt else aes_ige_encrypt(key, iv, data)
+
+def segmented_ige(aes_key, aes_iv, msg_key, seg_hdr, data, decrypt=False, executor=None):
+    """
+    Segmented AES-256-IGE over data (a multiple of 16 bytes): each segment is an
+    independent IGE chain with its own key/IV, so segments can run in parallel
+    on `executor` and be decrypted individually.
+    """
+    if len(data) % 16:
+        raise ValueError("Data length must be a multiple of 16")
+    segment_size = parse_segment_header(seg_hdr)
+    prk = _segment_prk(aes_key, aes_iv, msg_key)
+    jobs = []
+    for index, start in enumerate(range(0, len(data), segment_size)):
+        okm = hkdf_expand(prk, _segment_info(seg_hdr, index), 64)
+        jobs.append((okm[:32], okm[32:], data[start:start + segment_size], decrypt))
+    mapper = map if executor is None else executor.map
+    return b"".join(mapper(_segment_job, jobs))
+
+def segmented_ige_decrypt_into(aes_key, aes_iv, msg_key, seg_hdr, data, out):
+    """Buffer-protocol variant of segmented_ige(..., decrypt=True): each segment is decrypted in place into `out`."""
+    if len(data) % 16:
+        raise ValueError("Data length must be a multiple of 16")
+    segment_size = parse_segment_header(seg_hdr)
+    prk = _segment_prk(aes_key, aes_iv, msg_key)
+    ov = memoryview(out)
+    for index, start in enumerate(range(0, len(data), segment_size)):
+        okm = hkdf_expand(prk, _segment_info(seg_hdr, index), 64)
+        end = min(start + segment_size, len(data))
+        aes_ige_decrypt_into(okm[:32], okm[32:], data[start:end], ov[start:end])
+    return len(data)
+
 ########################
 # Protocol API Classes #
 ########################
@@ -452,11 +1331,47 @@ class RottikolSession:
     Manages session, key establishment, and message encryption/decryption.
     Provides PFS, deniability, unlinkability by ephemeral DH.
     """
+    __slots__ = ('auth_key', 'auth_key_id', 'session_id', 'salt', '_msg_key_prefix', '_kdf_parts')
+
     def __init__(self, auth_key, auth_key_id, session_id, salt):
         self.auth_key = auth_key  # 256 bytes (2048 bits)
         self.auth_key_id = auth_key_id  # 8 bytes (SHA1(auth_key)[-8:])
         self.session_id = session_id  # 8 bytes
         self.salt = salt  # 8 bytes
+        self._precompute_key_parts()
+
+    def _precompute_key_parts(self):
+        """
+        Caches the fixed auth_key slices and SHA-256 prefix states used by
+        msg_key and AES key/IV derivation, so per-message work is copy() + update().
+        """
+        auth_key = self.auth_key
+        self._msg_key_prefix = hashlib.sha256(auth_key[88:88+32])
+        # Index 0: x=0 client->server, index 1: x=8 server->client (see derive_aes_key_iv)
+        self._kdf_parts = tuple(
+            (auth_key[x:x+36], hashlib.sha256(auth_key[40+x:40+x+36]))
+            for x in (0, 8)
+        )
+
+    def msg_key_for(self, body, padding):
+        """Same as mtproto_msg_key(self.auth_key, body, padding), using the cached prefix."""
+        h = self._msg_key_prefix.copy()
+        h.update(body)
+        h.update(padding)
+        return h.digest()[8:24]
+
+    def derive_key_iv(self, msg_key, direction):
+        """Same as derive_aes_key_iv(self.auth_key, msg_key, direction), using cached parts."""
+        a_suffix, b_prefix = self._kdf_parts[0 if direction == 0 else 1]
+        h = hashlib.sha256(msg_key)
+        h.update(a_suffix)
+        sha256_a = h.digest()
+        h = b_prefix.copy()
+        h.update(msg_key)
+        sha256_b = h.digest()
+        aes_key = sha256_a[:8] + sha256_b[8:24] + sha256_a[24:32]
+        aes_iv  = sha256_b[:8] + sha256_a[8:24] + sha256_b[24:32]
+        return aes_key, aes_iv
 
     @staticmethod
     def generate_session():
@@ -472,12 +1387,8 @@ class RottikolSession:
         session_id, salt = RottikolSession.generate_session()
         return RottikolSession(auth_key, auth_key_id, session_id, salt)
 
-    def encrypt(self, msg_data, direction=0):
-        """
-        Encrypt message data (bytes) using the session (MTProto2.0-like):
-          External header: 8B auth_key_id, 16B msg_key
-          Encrypted: 8B salt, 8B session_id, 8B msg_id, 4B seq_no, 4B msg_len, msg_data, padding
-        """
+    def _seal(self, msg_data, direction):
+        """Builds the padded plaintext and returns (msg_key, aes_key, aes_iv, plaintext)."""
         # Compose message
         msg_id = int(time.time() * (2**32))
         seq_no = 1
@@ -495,24 +1406,22 @@ class RottikolSession:
         pad_len = min_pad + (16 - ((len(body) + min_pad) % 16)) % 16
         padding = random_bytes(pad_len)
         plaintext = body + padding
-        msg_key = mtproto_msg_key(self.auth_key, body, padding)
-        aes_key, aes_iv = derive_aes_key_iv(self.auth_key, msg_key, direction)
-        ciphertext = aes_ige_encrypt(aes_key, aes_iv, plaintext)
-        ext_hdr = make_external_header(self.auth_key_id, msg_key)
-        return ext_hdr + ciphertext
+        msg_key = self.msg_key_for(body, padding)
+        aes_key, aes_iv = self.derive_key_iv(msg_key, direction)
+        return msg_key, aes_key, aes_iv, plaintext
 
-    def decrypt(self, payload, direction=0):
-        """
-        Decrypts an encrypted message (MTProto2.0-like).
-        Returns: (msg_id, seq_no, msg_data)
-        """
+    def _open_keys(self, payload, direction):
+        """Checks the external header and returns (msg_key, aes_key, aes_iv, ciphertext)."""
         ext_hdr, ciphertext = payload[:24], payload[24:]
         auth_key_id = ext_hdr[:8]
         msg_key = ext_hdr[8:24]
         if auth_key_id != self.auth_key_id:
             raise ValueError("Unknown auth_key_id")
-        aes_key, aes_iv = derive_aes_key_iv(self.auth_key, msg_key, direction)
-        plaintext = aes_ige_decrypt(aes_key, aes_iv, ciphertext)
+        aes_key, aes_iv = self.derive_key_iv(msg_key, direction)
+        return msg_key, aes_key, aes_iv, ciphertext
+
+    def _parse_plaintext(self, plaintext, msg_key):
+        """Checks the inner header and msg_key; returns (msg_id, seq_no, msg_data)."""
         # Remove random padding: parse up to msg_len
         salt = plaintext[:8]
         session_id = plaintext[8:16]
@@ -526,47 +1435,915 @@ class RottikolSession:
         pad_start = 32 + msg_len
         padding = plaintext[pad_start:]
         body = plaintext[:32+msg_len]
-        check_msg_key = mtproto_msg_key(self.auth_key, body, padding)
+        check_msg_key = self.msg_key_for(body, padding)
         if check_msg_key != msg_key:
             raise ValueError("msg_key mismatch (integrity failure)")
         return msg_id, seq_no, msg_data
 
+    def encrypt(self, msg_data, direction=0, segment_size=None, executor=None):
+        """
+        Encrypt message data (bytes) using the session (MTProto2.0-like):
+          External header: 8B auth_key_id, 16B msg_key
+          Encrypted: 8B salt, 8B session_id, 8B msg_id, 4B seq_no, 4B msg_len, msg_data, padding
+        With segment_size (a multiple of 16) the plaintext is split into segments
+        that are IGE-encrypted independently (see segmented_ige); `executor`
+        (e.g. a ProcessPoolExecutor) runs the segments in parallel.
+        """
+        msg_key, aes_key, aes_iv, plaintext = self._seal(msg_data, direction)
+        ext_hdr = make_external_header(self.auth_key_id, msg_key)
+        if segment_size is not None:
+            seg_hdr = make_segment_header(segment_size)
+            ciphertext = segmented_ige(aes_key, aes_iv, msg_key, seg_hdr, plaintext, executor=executor)
+            return ext_hdr + seg_hdr + ciphertext
+        ciphertext = _active_backend.aes_ige_encrypt(aes_key, aes_iv, plaintext)
+        return ext_hdr + ciphertext
+
+    def decrypt(self, payload, direction=0, executor=None):
+        """
+        Decrypts an encrypted message (MTProto2.0-like), single-chain or segmented.
+        Returns: (msg_id, seq_no, msg_data)
+        """
+        msg_key, aes_key, aes_iv, ciphertext = self._open_keys(payload, direction)
+        if is_segmented(payload):
+            seg_hdr, ciphertext = ciphertext[:_SEGMENT_HDR.size], ciphertext[_SEGMENT_HDR.size:]
+            plaintext = segmented_ige(aes_key, aes_iv, msg_key, seg_hdr, ciphertext,
+                                      decrypt=True, executor=executor)
+        else:
+            plaintext = _active_backend.aes_ige_decrypt(aes_key, aes_iv, ciphertext)
+        return self._parse_plaintext(plaintext, msg_key)
+
+    def decrypt_segment(self, payload, index, direction=0):
+        """
+        Random access into a segmented payload: decrypts only segment `index` and
+        returns its raw plaintext bytes (segment 0 starts with the 32-byte inner
+        header; the last segment ends with the random padding). The msg_key covers
+        the whole message, so a single segment is NOT authenticated; use decrypt()
+        when integrity matters.
+        """
+        if not is_segmented(payload):
+            raise ValueError("Payload is not segmented")
+        msg_key, aes_key, aes_iv, ciphertext = self._open_keys(payload, direction)
+        seg_hdr = ciphertext[:_SEGMENT_HDR.size]
+        segment_size = parse_segment_header(seg_hdr)
+        start = _SEGMENT_HDR.size + index * segment_size
+        if index < 0 or start >= len(ciphertext):
+            raise IndexError("Segment index out of range")
+        key, iv = segment_key_iv(aes_key, aes_iv, msg_key, seg_hdr, index)
+        return aes_ige_decrypt(key, iv, ciphertext[start:start + segment_size])
+
+    def encrypt_many(self, msgs, direction=0):
+        """
+        Encrypts a list of messages in one batch call on the active backend
+        (see aes_ige_encrypt_many). Returns a list of payloads, same format as encrypt().
+        """
+        sealed = [self._seal(m, direction) for m in msgs]
+        cts = _active_backend.aes_ige_encrypt_many([s[1] for s in sealed], [s[2] for s in sealed], [s[3] for s in sealed])
+        return [make_external_header(self.auth_key_id, s[0]) + ct for s, ct in zip(sealed, cts)]
+
+    def decrypt_many(self, payloads, direction=0):
+        """
+        Decrypts a list of payloads; returns a list of (msg_id, seq_no, msg_data).
+        Single-chain payloads go through one batch call on the active backend;
+        segmented payloads are decrypted one by one through decrypt().
+        """
+        results = [None] * len(payloads)
+        batch = []
+        for i, payload in enumerate(payloads):
+            if is_segmented(payload):
+                results[i] = self.decrypt(payload, direction)
+            else:
+                batch.append((i, self._open_keys(payload, direction)))
+        pts = _active_backend.aes_ige_decrypt_many([o[1] for _, o in batch], [o[2] for _, o in batch],
+                                                   [o[3] for _, o in batch])
+        for (i, o), pt in zip(batch, pts):
+            results[i] = self._parse_plaintext(pt, o[0])
+        return results
+
+    @staticmethod
+    def encrypted_size(msg_len):
+        """Size of encrypt()/encrypt_into() output for a msg_data of msg_len bytes."""
+        body_len = 32 + msg_len
+        return 24 + body_len + 12 + (16 - ((body_len + 12) % 16)) % 16
+
+    def encrypt_into(self, msg_data, out, direction=0):
+        """
+        Buffer-protocol variant of encrypt(): the plaintext is assembled and
+        encrypted in place inside `out` (bytearray or writable memoryview of at
+        least encrypted_size(len(msg_data)) bytes). Returns the bytes written.
+        """
+        total = self.encrypted_size(len(msg_data))
+        ov = memoryview(out)
+        if len(ov) < total:
+            raise ValueError("Output buffer too small")
+        msg_len = len(msg_data)
+        body_end = 24 + 32 + msg_len
+        struct.pack_into('<8s8sQII', ov, 24, self.salt, self.session_id,
+                         int(time.time() * (2**32)), 1, msg_len)
+        ov[56:body_end] = msg_data
+        ov[body_end:total] = random_bytes(total - body_end)
+        msg_key = self.msg_key_for(ov[24:body_end], ov[body_end:total])
+        aes_key, aes_iv = self.derive_key_iv(msg_key, direction)
+        pt = ov[24:total]
+        aes_ige_encrypt_into(aes_key, aes_iv, pt, pt)
+        ov[0:8] = self.auth_key_id
+        ov[8:24] = msg_key
+        return total
+
+    def decrypt_into(self, payload, out, direction=0):
+        """
+        Buffer-protocol variant of decrypt(), single-chain or segmented: `payload`
+        may be any bytes-like object (e.g. a memoryview over a recv_into buffer);
+        the plaintext is written into `out` (at least len(payload) - 24 bytes).
+        Returns (msg_id, seq_no, data_offset, msg_len) with msg_data at
+        out[data_offset:data_offset + msg_len]; no per-message bytes are created
+        for the payload or plaintext.
+        """
+        view = memoryview(payload)
+        hdr_len = 24 + (_SEGMENT_HDR.size if is_segmented(view) else 0)
+        if len(view) < hdr_len + 32 or (len(view) - hdr_len) % 16:
+            raise ValueError("Invalid payload length")
+        if view[:8] != self.auth_key_id:
+            raise ValueError("Unknown auth_key_id")
+        msg_key = view[8:24]
+        n = len(view) - hdr_len
+        ov = memoryview(out)
+        if len(ov) < n:
+            raise ValueError("Output buffer too small")
+        aes_key, aes_iv = self.derive_key_iv(msg_key, direction)
+        if hdr_len > 24:
+            segmented_ige_decrypt_into(aes_key, aes_iv, bytes(msg_key), bytes(view[24:hdr_len]), view[hdr_len:], ov)
+        else:
+            aes_ige_decrypt_into(aes_key, aes_iv, view[24:], ov)
+        if ov[0:8] != self.salt or ov[8:16] != self.session_id:
+            raise ValueError("Session or salt mismatch")
+        msg_id, seq_no, msg_len = struct.unpack_from('<QII', ov, 16)
+        if msg_len > n - 32:
+            raise ValueError("Invalid message length")
+        check_msg_key = self.msg_key_for(ov[:32+msg_len], ov[32+msg_len:n])
+        if check_msg_key != msg_key:
+            raise ValueError("msg_key mismatch (integrity failure)")
+        return msg_id, seq_no, 32, msg_len
+
+    def encrypt_container(self, msgs, direction=0, seq_nos=None):
+        """
+        Packs many small messages into one encrypted envelope, so the padding draw,
+        msg_key, key/IV derivation and AES key schedule are paid once per batch.
+        Each item keeps its own msg_id, seq_no and length (see pack_container).
+        """
+        return self.encrypt(pack_container(msgs, seq_nos), direction)
+
+    def decrypt_container(self, payload, direction=0):
+        """
+        Decrypts and authenticates an envelope from encrypt_container(), then
+        lazily yields its (msg_id, seq_no, msg_data) items.
+        """
+        _, _, body = self.decrypt(payload, direction)
+        return iter_container(body)
+
+#############################
+# Multi-session Router      #
+#############################
+class SessionStore:
+    """
+    Routes raw payloads to sessions by the 8-byte auth_key_id of the external
+    header (one dict lookup). Entries are kept in LRU order; the store evicts
+    the least recently used session beyond max_sessions and, when idle_timeout
+    is set, sessions unused for that many seconds. Idle sessions form the LRU
+    head, so add() and get() prune them as they go (amortized O(1): each
+    session is dropped once); evict_idle() does the same on demand.
+    """
+    def __init__(self, max_sessions=None, idle_timeout=None, clock=time.monotonic):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._clock = clock
+        self._sessions = OrderedDict()  # auth_key_id -> [session, last_used]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, auth_key_id):
+        return bytes(auth_key_id) in self._sessions
+
+    def add(self, session):
+        with self._lock:
+            now = self._clock()
+            self._evict_idle_locked(now)
+            self._sessions[session.auth_key_id] = [session, now]
+            self._sessions.move_to_end(session.auth_key_id)
+            if self.max_sessions is not None:
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+
+    def remove(self, auth_key_id):
+        with self._lock:
+            entry = self._sessions.pop(bytes(auth_key_id), None)
+        return entry[0] if entry else None
+
+    def evict_idle(self):
+        """Drops sessions idle for longer than idle_timeout; returns how many were dropped."""
+        if self.idle_timeout is None:
+            return 0
+        with self._lock:
+            return self._evict_idle_locked(self._clock())
+
+    def _evict_idle_locked(self, now):
+        # Caller holds self._lock; pops expired entries off the LRU head
+        if self.idle_timeout is None:
+            return 0
+        deadline = now - self.idle_timeout
+        dropped = 0
+        sessions = self._sessions
+        while sessions:
+            key = next(iter(sessions))
+            if sessions[key][1] >= deadline:
+                break
+            del sessions[key]
+            dropped += 1
+        return dropped
+
+    def get(self, auth_key_id):
+        """Returns the session for auth_key_id (marking it used) or None."""
+        key = bytes(auth_key_id)
+        with self._lock:
+            now = self._clock()
+            self._evict_idle_locked(now)
+            entry = self._sessions.get(key)
+            if entry is None:
+                return None
+            entry[1] = now
+            self._sessions.move_to_end(key)
+        return entry[0]
+
+    def route(self, payload):
+        """Returns the session a raw payload belongs to."""
+        session = self.get(memoryview(payload)[:8])
+        if session is None:
+            raise ValueError("Unknown auth_key_id")
+        return session
+
+    def decrypt(self, payload, direction=0):
+        """Routes and decrypts one payload; returns (session, (msg_id, seq_no, msg_data))."""
+        session = self.route(payload)
+        return session, session.decrypt(payload, direction)
+
+    def route_and_decrypt(self, frames, direction=0, return_exceptions=False):
+        """
+        Routes a batch of frames and decrypts them, grouping frames per session
+        so each group goes through RottikolSession.decrypt_many.
+        Returns a list of (session, (msg_id, seq_no, msg_data)) in frame order; with
+        return_exceptions=True a failing frame yields (session_or_None, exception).
+        """
+        self.evict_idle()
+        results = [None] * len(frames)
+        groups = {}
+        for i, frame in enumerate(frames):
+            session = self.get(memoryview(frame)[:8])
+            if session is None:
+                if not return_exceptions:
+                    raise ValueError("Unknown auth_key_id")
+                results[i] = (None, ValueError("Unknown auth_key_id"))
+                continue
+            groups.setdefault(session.auth_key_id, (session, []))[1].append(i)
+        for session, idxs in groups.values():
+            try:
+                decoded = session.decrypt_many([frames[i] for i in idxs], direction)
+            except ValueError:
+                if not return_exceptions:
+                    raise
+                # Fall back to per-frame decryption to isolate the bad frame(s)
+                decoded = []
+                for i in idxs:
+                    try:
+                        decoded.append(session.decrypt(frames[i], direction))
+                    except ValueError as exc:
+                        decoded.append(exc)
+            for i, res in zip(idxs, decoded):
+                results[i] = (session, res)
+        return results
+
+#############################
+# Background Rekeying       #
+#############################
+def _rekey_dh_job(peer_public=None, private=None, short_exponent=False):
+    """Process-pool job for the DH steps of a rekey (keygen or shared secret)."""
+    if private is None:
+        kp = DHKeyPair(short_exponent=short_exponent)
+        return kp.private, kp.public
+    return DHKeyPair(private, public=0).compute_shared(peer_public)  # public unused here
+
+_rekey_executor = None
+_rekey_executor_lock = threading.Lock()
+
+def _shared_rekey_executor():
+    """One-process pool shared by every RekeyingSession without its own executor."""
+    global _rekey_executor
+    with _rekey_executor_lock:
+        if _rekey_executor is None:
+            _rekey_executor = ProcessPoolExecutor(max_workers=1)
+        return _rekey_executor
+
+class RekeyingSession:
+    """
+    Wraps a RottikolSession and replaces it with a fresh DH-derived successor
+    once a message count, byte count or age limit is reached.
+    The rekey runs on a background thread: it generates the next DHKeyPair,
+    calls exchange(our_public) -> peer_public (the caller's transport), derives
+    the successor session and then switches over atomically. The previous
+    auth_key_id stays accepted by decrypt() for `grace` seconds.
+    The DH math runs on `executor`, or by default on a one-process
+    ProcessPoolExecutor created on first use and shared by all instances, so the
+    2048-bit exponentiations never hold this process's GIL and encrypt/decrypt
+    latency stays flat during a rekey. in_process=True runs them on the rekey
+    thread instead: no extra process, but each pow() stalls message traffic
+    for tens of milliseconds (short_exponent shortens the stall, not removes it).
+    """
+    def __init__(self, session, exchange, max_messages=None, max_bytes=None, max_age=None,
+                 grace=30.0, executor=None, short_exponent=False, on_rekey=None,
+                 clock=time.monotonic, in_process=False):
+        self._current = session
+        self.exchange = exchange
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.grace = grace
+        self.executor = executor
+        self.in_process = in_process
+        self.short_exponent = short_exponent
+        self.on_rekey = on_rekey
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._retired = {}  # auth_key_id -> (session, expires_at)
+        self._thread = None
+        self.rekeys = 0
+        self.last_error = None
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self._messages = 0
+        self._bytes = 0
+        self._started = self._clock()
+
+    @property
+    def session(self):
+        return self._current
+
+    def _due(self):
+        return ((self.max_messages is not None and self._messages >= self.max_messages) or
+                (self.max_bytes is not None and self._bytes >= self.max_bytes) or
+                (self.max_age is not None and self._clock() - self._started >= self.max_age))
+
+    def _maybe_start_rekey(self):
+        # Caller holds self._lock
+        if self._thread is None and self._due():
+            self._thread = threading.Thread(target=self._rekey, name="RottikolRekey", daemon=True)
+            self._thread.start()
+
+    def rekey_now(self):
+        """Starts a rekey immediately (no-op if one is already running)."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._rekey, name="RottikolRekey", daemon=True)
+                self._thread.start()
+
+    def join(self, timeout=None):
+        """Waits for an in-flight rekey to finish."""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def close(self):
+        """Waits for an in-flight rekey (the shared process pool stays up)."""
+        self.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _dh_executor(self):
+        return self.executor if self.executor is not None else _shared_rekey_executor()
+
+    def _rekey(self):
+        try:
+            if self.in_process:
+                kp = DHKeyPair(short_exponent=self.short_exponent)
+                peer_public = self.exchange(kp.public)
+                shared = kp.compute_shared(peer_public)
+            else:
+                executor = self._dh_executor()
+                private, public = executor.submit(
+                    _rekey_dh_job, short_exponent=self.short_exponent).result()
+                peer_public = self.exchange(public)
+                shared = executor.submit(_rekey_dh_job, peer_public, private).result()
+            old = self._current
+            auth_key = shared.ljust(256, b'\x00')
+            successor = RottikolSession(auth_key, sha1(auth_key)[-8:], old.session_id, old.salt)
+            with self._lock:
+                now = self._clock()
+                self._retired = {k: v for k, v in self._retired.items() if v[1] > now}
+                self._retired[old.auth_key_id] = (old, now + self.grace)
+                self._current = successor
+                self._reset_counters()
+                self.rekeys += 1
+                self.last_error = None
+            if self.on_rekey is not None:
+                self.on_rekey(old, successor)
+        except Exception as exc:
+            # Keep using the current session; the next message retries
+            self.last_error = exc
+        finally:
+            with self._lock:
+                self._thread = None
+
+    def encrypt(self, msg_data, direction=0, **kwargs):
+        with self._lock:
+            session = self._current
+            self._messages += 1
+            self._bytes += len(msg_data)
+            self._maybe_start_rekey()
+        return session.encrypt(msg_data, direction, **kwargs)
+
+    def decrypt(self, payload, direction=0, **kwargs):
+        auth_key_id = bytes(memoryview(payload)[:8])
+        session = self._current
+        if auth_key_id != session.auth_key_id:
+            with self._lock:
+                entry = self._retired.get(auth_key_id)
+                if entry is None or entry[1] <= self._clock():
+                    self._retired.pop(auth_key_id, None)
+                    raise ValueError("Unknown auth_key_id")
+                session = entry[0]
+        return session.decrypt(payload, direction, **kwargs)
+
+#############################
+# Parallel Session Codec    #
+#############################
+_WORKER_SESSION = None
+
+def _codec_worker_init(auth_key, auth_key_id, session_id, salt):
+    """Process-pool initializer: builds the worker's session once."""
+    global _WORKER_SESSION
+    _WORKER_SESSION = RottikolSession(auth_key, auth_key_id, session_id, salt)
+
+def _codec_worker_encrypt(msg_data, direction):
+    return _WORKER_SESSION.encrypt(msg_data, direction)
+
+def _codec_worker_decrypt(payload, direction):
+    return _WORKER_SESSION.decrypt(payload, direction)
+
+class ParallelSessionCodec:
+    """
+    Runs RottikolSession.encrypt/decrypt jobs on a process pool.
+    The session state (auth_key, auth_key_id, session_id, salt) is sent to each
+    worker once via the pool initializer; jobs only carry the message bytes.
+    Results are the same as calling the session serially.
+    """
+    def __init__(self, session, workers=None):
+        self.session = session
+        self._pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_codec_worker_init,
+            initargs=(session.auth_key, session.auth_key_id, session.session_id, session.salt),
+        )
+
+    def submit_encrypt(self, msg_data, direction=0):
+        """Returns a Future for session.encrypt(msg_data, direction)."""
+        return self._pool.submit(_codec_worker_encrypt, msg_data, direction)
+
+    def submit_decrypt(self, payload, direction=0):
+        """Returns a Future for session.decrypt(payload, direction)."""
+        return self._pool.submit(_codec_worker_decrypt, payload, direction)
+
+    def encrypt_iter(self, msgs, direction=0, chunksize=16):
+        """Encrypts an iterable of messages; yields payloads in input order."""
+        return self._pool.map(_codec_worker_encrypt, msgs, itertools.repeat(direction), chunksize=chunksize)
+
+    def decrypt_iter(self, payloads, direction=0, chunksize=16):
+        """Decrypts an iterable of payloads; yields (msg_id, seq_no, msg_data) in input order."""
+        return self._pool.map(_codec_worker_decrypt, payloads, itertools.repeat(direction), chunksize=chunksize)
+
+    def close(self, wait=True):
+        self._pool.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+###################
+# Crypto Backends #
+###################
+class ReferenceBackend:
+    """
+    Backend interface and the reference implementation (the manual primitives in
+    this file). Other backends must produce byte-identical output (same wire format).
+    """
+    name = 'reference'
+
+    def aes_ige_encrypt(self, key, iv, data):
+        return aes_ige_encrypt(key, iv, data)
+
+    def aes_ige_decrypt(self, key, iv, data):
+        return aes_ige_decrypt(key, iv, data)
+
+    def aes_ige_encrypt_many(self, keys, ivs, datas):
+        return aes_ige_encrypt_many(keys, ivs, datas)
+
+    def aes_ige_decrypt_many(self, keys, ivs, datas):
+        return aes_ige_decrypt_many(keys, ivs, datas)
+
+    def hmac_sha256(self, key, msg):
+        return hmac_sha256(key, msg)
+
+    def hkdf(self, ikm, salt, info, length):
+        return hkdf(ikm, salt, info, length)
+
+    def rsa_encrypt(self, msg, rsa_public):
+        return rsa_public.encrypt_bytes(msg)
+
+    def rsa_decrypt(self, ct, rsa_private):
+        return rsa_private.decrypt_bytes(ct)
+
+class CryptographyBackend(ReferenceBackend):
+    """
+    Accelerated backend: AES-256 block operations via the `cryptography`
+    package's AES-ECB (IGE chaining stays here) and PKCS#1 v1.5 RSA encryption
+    via its RSA keys. HMAC/HKDF are inherited (they already run on hashlib).
+    RSA decryption is inherited too: OpenSSL's PKCS#1 v1.5 implicit rejection
+    returns random bytes for a bad ciphertext instead of raising, which would
+    break the rsa_decrypt contract (ValueError("Incorrect padding")).
+    """
+    name = 'accelerated'
+
+    def __init__(self):
+        if Cipher is None:
+            raise ImportError("cryptography is not installed")
+        self._rsa_cache = weakref.WeakKeyDictionary()
+
+    def _ige(self, key, iv, data, decrypt):
+        _ige_check(key, iv)
+        cipher = Cipher(algorithms.AES(bytes(key)), modes.ECB())
+        block = (cipher.decryptor() if decrypt else cipher.encryptor()).update
+        from_bytes = int.from_bytes
+        c_prev, p_prev = from_bytes(iv[:16], 'big'), from_bytes(iv[16:32], 'big')
+        if decrypt:
+            c_prev, p_prev = p_prev, c_prev  # x_prev/y_prev roles swap (see _np_ige_many)
+        out = bytearray(len(data))
+        view = memoryview(data)
+        for off in range(0, len(data), 16):
+            x = from_bytes(view[off:off + 16], 'big')
+            y = from_bytes(block((x ^ c_prev).to_bytes(16, 'big')), 'big') ^ p_prev
+            out[off:off + 16] = y.to_bytes(16, 'big')
+            c_prev, p_prev = y, x
+        return bytes(out)
+
+    def aes_ige_encrypt(self, key, iv, data):
+        if len(data) % 16 != 0:
+            data = pad_pkcs7(bytes(data), 16)
+        return self._ige(key, iv, data, False)
+
+    def aes_ige_decrypt(self, key, iv, data):
+        if len(data) % 16 != 0:
+            raise ValueError('Ciphertext length must be a multiple of 16')
+        return self._ige(key, iv, data, True)
+
+    # Per-message ECB calls already beat the NumPy lanes, so batches just loop
+    def aes_ige_encrypt_many(self, keys, ivs, datas):
+        if not (len(keys) == len(ivs) == len(datas)):
+            raise ValueError('keys, ivs and datas must have the same length')
+        return [self.aes_ige_encrypt(k, iv, d) for k, iv, d in zip(keys, ivs, datas)]
+
+    def aes_ige_decrypt_many(self, keys, ivs, datas):
+        if not (len(keys) == len(ivs) == len(datas)):
+            raise ValueError('keys, ivs and datas must have the same length')
+        return [self.aes_ige_decrypt(k, iv, d) for k, iv, d in zip(keys, ivs, datas)]
+
+    def _rsa_public_key(self, key):
+        cached = self._rsa_cache.get(key)
+        if cached is None:
+            cached = self._rsa_cache[key] = crypto_rsa.RSAPublicNumbers(key.e, key.n).public_key()
+        return cached
+
+    def rsa_encrypt(self, msg, rsa_public):
+        return self._rsa_public_key(rsa_public).encrypt(bytes(msg), crypto_padding.PKCS1v15())
+
+_BACKEND_FACTORIES = {}
+_backends = {}
+_active_backend = None
+_new_backend_hook = None  # called with each newly created backend (instrumentation)
+
+def register_backend(name, factory):
+    """Registers a backend factory (a class or callable returning a backend)."""
+    _BACKEND_FACTORIES[name] = factory
+    _backends.pop(name, None)
+
+def available_backends():
+    """Names of registered backends that can be instantiated here."""
+    names = []
+    for name in _BACKEND_FACTORIES:
+        try:
+            get_backend(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+def get_backend(name=None):
+    """Returns the named backend (instances are cached), or the active one."""
+    if name is None:
+        return _active_backend
+    backend = _backends.get(name)
+    if backend is None:
+        try:
+            factory = _BACKEND_FACTORIES[name]
+        except KeyError:
+            raise ValueError("Unknown crypto backend: %r" % (name,))
+        backend = _backends[name] = factory()
+        if _new_backend_hook is not None:
+            _new_backend_hook(backend)
+    return backend
+
+def set_backend(name):
+    """Selects the backend used by the high-level API and RottikolSession."""
+    global _active_backend
+    _active_backend = get_backend(name)
+    return _active_backend
+
+register_backend('reference', ReferenceBackend)
+register_backend('accelerated', CryptographyBackend)
+# Use the accelerated backend when `cryptography` imports, otherwise fall back silently
+set_backend('accelerated' if Cipher is not None else 'reference')
+
+###################
+# Instrumentation #
+###################
+# Opt-in: enable_instrumentation() swaps the listed functions/methods for timed
+# wrappers and disable_instrumentation() puts the originals back, so a disabled
+# build runs the original code with no extra checks. Code that imported these
+# names directly (from client import aes_ige_encrypt) keeps the unwrapped version.
+# Backend methods are wrapped per instance, since with the accelerated backend
+# the session and high-level RSA calls never reach the module-level functions.
+_HIST_BUCKETS = 27  # bucket i counts calls taking < 2**i microseconds (last: slower)
+
+class OpStats:
+    """Call count, byte count, total time and a log2(microseconds) latency histogram."""
+    __slots__ = ('calls', 'bytes', 'errors', 'total_s', 'max_s', 'histogram')
+
+    def __init__(self):
+        self.calls = 0
+        self.bytes = 0
+        self.errors = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.histogram = [0] * _HIST_BUCKETS
+
+    def record(self, elapsed, nbytes, failed):
+        self.calls += 1
+        self.bytes += nbytes
+        self.errors += failed
+        self.total_s += elapsed
+        if elapsed > self.max_s:
+            self.max_s = elapsed
+        self.histogram[min(int(elapsed * 1e6).bit_length(), _HIST_BUCKETS - 1)] += 1
+
+    def as_dict(self):
+        return {
+            'calls': self.calls,
+            'bytes': self.bytes,
+            'errors': self.errors,
+            'total_s': self.total_s,
+            'mean_s': self.total_s / self.calls if self.calls else 0.0,
+            'max_s': self.max_s,
+            'histogram_us_le': {str(1 << i): n for i, n in enumerate(self.histogram) if n},
+        }
+
+_stats = {}
+_stats_lock = threading.Lock()
+_profile_hook = None
+_profile_every = 1
+_instrumented_originals = {}
+
+def _nbytes_arg(index):
+    return lambda args, kwargs: len(args[index]) if len(args) > index else 0
+
+# (owner, attribute, operation name, bytes-of-call)
+_INSTRUMENT_POINTS = [
+    ('module', 'aes_ige_encrypt', 'aes_ige_encrypt', _nbytes_arg(2)),
+    ('module', 'aes_ige_decrypt', 'aes_ige_decrypt', _nbytes_arg(2)),
+    ('module', 'aes_ige_encrypt_into', 'aes_ige_encrypt_into', _nbytes_arg(2)),
+    ('module', 'aes_ige_decrypt_into', 'aes_ige_decrypt_into', _nbytes_arg(2)),
+    ('module', 'hkdf', 'hkdf', lambda args, kwargs: args[3] if len(args) > 3 else 0),
+    ('module', 'hkdf_expand', 'hkdf_expand', lambda args, kwargs: args[2] if len(args) > 2 else 0),
+    ('RottikolSession', 'encrypt', 'session.encrypt', _nbytes_arg(1)),
+    ('RottikolSession', 'decrypt', 'session.decrypt', _nbytes_arg(1)),
+    ('RottikolSession', 'derive_key_iv', 'session.derive_key_iv', lambda args, kwargs: 0),
+    ('RottikolSession', 'msg_key_for', 'session.msg_key', lambda args, kwargs: len(args[1]) + len(args[2])),
+    ('RottikolSession', '_seal', 'session.seal', _nbytes_arg(1)),
+    ('RottikolSession', '_parse_plaintext', 'session.verify', _nbytes_arg(1)),
+    ('RSAKey', 'generate', 'rsa.generate', lambda args, kwargs: 0),
+    ('RSAKey', 'encrypt_bytes', 'rsa.encrypt', _nbytes_arg(1)),
+    ('RSAKey', 'decrypt_bytes', 'rsa.decrypt', _nbytes_arg(1)),
+    ('RSAKey', 'pkcs1v15_pad', 'rsa.pad', _nbytes_arg(1)),
+    ('DHKeyPair', '__init__', 'dh.keygen', lambda args, kwargs: 0),
+    ('DHKeyPair', 'compute_shared', 'dh.shared', lambda args, kwargs: 0),
+    # Bound backend methods: args do not include self
+    ('backend', 'aes_ige_encrypt', 'backend.aes_ige_encrypt', _nbytes_arg(2)),
+    ('backend', 'aes_ige_decrypt', 'backend.aes_ige_decrypt', _nbytes_arg(2)),
+    ('backend', 'aes_ige_encrypt_many', 'backend.aes_ige_encrypt_many',
+     lambda args, kwargs: sum(map(len, args[2])) if len(args) > 2 else 0),
+    ('backend', 'aes_ige_decrypt_many', 'backend.aes_ige_decrypt_many',
+     lambda args, kwargs: sum(map(len, args[2])) if len(args) > 2 else 0),
+    ('backend', 'hmac_sha256', 'backend.hmac_sha256', _nbytes_arg(1)),
+    ('backend', 'hkdf', 'backend.hkdf', lambda args, kwargs: args[3] if len(args) > 3 else 0),
+    ('backend', 'rsa_encrypt', 'backend.rsa_encrypt', _nbytes_arg(0)),
+    ('backend', 'rsa_decrypt', 'backend.rsa_decrypt', _nbytes_arg(0)),
+]
+_instrumented_backends = []
+
+def _instrument(func, op, nbytes):
+    perf_counter = time.perf_counter
+
+    def wrapper(*args, **kwargs):
+        t0 = perf_counter()
+        failed = 1
+        try:
+            result = func(*args, **kwargs)
+            failed = 0
+            return result
+        finally:
+            elapsed = perf_counter() - t0
+            try:
+                size = nbytes(args, kwargs)
+            except Exception:
+                size = 0
+            with _stats_lock:
+                stats = _stats.get(op)
+                if stats is None:
+                    stats = _stats[op] = OpStats()
+                stats.record(elapsed, size, failed)
+                sampled = _profile_hook is not None and stats.calls % _profile_every == 0
+            if sampled:
+                _profile_hook(op, elapsed, size)
+    wrapper.__name__ = getattr(func, '__name__', op)
+    wrapper.__doc__ = getattr(func, '__doc__', None)
+    wrapper.__wrapped__ = func
+    return wrapper
+
+def instrumentation_enabled():
+    return bool(_instrumented_originals)
+
+def enable_instrumentation():
+    """Wraps the hot-path operations with counters and latency histograms."""
+    global _new_backend_hook
+    if _instrumented_originals:
+        return
+    module = globals()
+    for owner_name, attr, op, nbytes in _INSTRUMENT_POINTS:
+        if owner_name == 'backend':
+            continue
+        if owner_name == 'module':
+            original = module[attr]
+            module[attr] = _instrument(original, op, nbytes)
+        else:
+            owner = module[owner_name]
+            original = owner.__dict__[attr]
+            if isinstance(original, staticmethod):
+                setattr(owner, attr, staticmethod(_instrument(original.__func__, op, nbytes)))
+            else:
+                setattr(owner, attr, _instrument(original, op, nbytes))
+        _instrumented_originals[(owner_name, attr)] = original
+    for backend in _backends.values():
+        _instrument_backend(backend)
+    _new_backend_hook = _instrument_backend
+
+def _instrument_backend(backend):
+    # Instance attributes shadow the class methods until disable_instrumentation()
+    for owner_name, attr, op, nbytes in _INSTRUMENT_POINTS:
+        if owner_name == 'backend':
+            backend.__dict__[attr] = _instrument(getattr(backend, attr), op, nbytes)
+    _instrumented_backends.append(backend)
+
+def disable_instrumentation():
+    """Restores the original (uninstrumented) functions; collected stats are kept."""
+    global _new_backend_hook
+    _new_backend_hook = None
+    module = globals()
+    for backend in _instrumented_backends:
+        for owner_name, attr, _, _ in _INSTRUMENT_POINTS:
+            if owner_name == 'backend':
+                backend.__dict__.pop(attr, None)
+    del _instrumented_backends[:]
+    for (owner_name, attr), original in _instrumented_originals.items():
+        if owner_name == 'module':
+            module[attr] = original
+        else:
+            setattr(module[owner_name], attr, original)
+    _instrumented_originals.clear()
+
+def set_profile_hook(hook, every=1):
+    """
+    Calls hook(op, elapsed_s, nbytes) for every `every`-th call of each operation
+    (e.g. to drive a sampling profiler or tracing); None removes the hook.
+    """
+    global _profile_hook, _profile_every
+    if every < 1:
+        raise ValueError("every must be >= 1")
+    _profile_every = every
+    _profile_hook = hook
+
+def instrumentation_snapshot(reset=False):
+    """Returns {operation: stats dict}; with reset=True the counters start over."""
+    global _stats
+    with _stats_lock:
+        snapshot = {op: s.as_dict() for op, s in _stats.items()}
+        if reset:
+            _stats = {}
+    return snapshot
+
+def export_instrumentation(fp=None, reset=False):
+    """Serializes instrumentation_snapshot() as JSON (written to fp if given)."""
+    data = json.dumps(instrumentation_snapshot(reset), indent=2, sort_keys=True)
+    if fp is not None:
+        fp.write(data)
+    return data
+
 ###############
 # High-level  #
 ###############
-def generate_dh_keypair():
-    return DHKeyPair()
+def generate_dh_keypair(short_exponent=False):
+    pool = _default_dh_pool
+    if pool is not None and pool.short_exponent == short_exponent:
+        return pool.get()
+    return DHKeyPair(short_exponent=short_exponent)
 
 def dh_compute_shared(private: DHKeyPair, peer_public: int):
     """Returns 256-byte shared secret."""
     return private.compute_shared(peer_public)
 
 def generate_rsa_keypair():
+    pool = _default_rsa_pool
+    if pool is not None and pool.bits == 2048 and pool.e == 65537:
+        return pool.get()
     return RSAKey.generate(2048, 65537)
 
 def rsa_encrypt(msg, rsa_public: RSAKey):
     """Encrypt message (bytes) with public RSA key."""
-    return rsa_public.encrypt_bytes(msg)
+    return _active_backend.rsa_encrypt(msg, rsa_public)
 
 def rsa_decrypt(ct, rsa_private: RSAKey):
     """Decrypt message (bytes) with private RSA key."""
-    return rsa_private.decrypt_bytes(ct)
+    return _active_backend.rsa_decrypt(ct, rsa_private)
+
+def _rsa_encrypt_job(job):
+    e, n, msg = job
+    return RSAKey(n, e).encrypt_bytes(msg)
+
+def rsa_encrypt_many(msgs, rsa_publics, executor=None):
+    """
+    Encrypts many (message, public key) pairs with PKCS#1 v1.5.
+    msgs may be one bytes object (wrapped to every key, e.g. a session key for a
+    recipient list) and rsa_publics may be one RSAKey (many messages to one key).
+    The padding strings for the whole batch come from a single CSPRNG draw;
+    with `executor` (e.g. a ProcessPoolExecutor) the jobs are fanned out instead.
+    """
+    if isinstance(msgs, (bytes, bytearray, memoryview)):
+        keys = list(rsa_publics)
+        msgs = [bytes(msgs)] * len(keys)
+    else:
+        msgs = list(msgs)
+        keys = [rsa_publics] * len(msgs) if isinstance(rsa_publics, RSAKey) else list(rsa_publics)
+    if len(msgs) != len(keys):
+        raise ValueError("msgs and rsa_publics must have the same length")
+    if executor is not None:
+        return list(executor.map(_rsa_encrypt_job, [(k.e, k.n, m) for k, m in zip(keys, msgs)]))
+    ps_lens = [(k.n.bit_length() + 7) // 8 - len(m) - 3 for k, m in zip(keys, msgs)]
+    if any(l < 8 for l in ps_lens):
+        raise ValueError("Message too long")
+    pool = nonzero_random_bytes(sum(ps_lens))
+    out, off = [], 0
+    for k, m, l in zip(keys, msgs, ps_lens):
+        out.append(k.encrypt_bytes(m, pool[off:off + l]))
+        off += l
+    return out
 
 def generate_auth_key_from_dh(dh_shared: bytes):
     """Create a RottikolSession from DH shared secret."""
     return RottikolSession.create_from_dh(dh_shared)
 
 def hkdf_derive(key, salt, info, length):
-    return hkdf(key, salt, info, length)
+    return _active_backend.hkdf(key, salt, info, length)
 
 def hmac256(key, msg):
-    return hmac_sha256(key, msg)
+    return _active_backend.hmac_sha256(key, msg)
 
 def aes256_ige_encrypt(key, iv, data):
-    return aes_ige_encrypt(key, iv, data)
+    return _active_backend.aes_ige_encrypt(key, iv, data)
 
 def aes256_ige_decrypt(key, iv, data):
-    return aes_ige_decrypt(key, iv, data)
+    return _active_backend.aes_ige_decrypt(key, iv, data)
 
 ##########################
 # API USAGE EXAMPLES     #
@@ -1,13 +1,50 @@
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
 import sys
-from http.server import BaseHTTPRequestHandler, HTTPServer
+import threading
+import time
+import traceback
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate, parsedate_to_datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 
-if len(sys.argv) != 3:
-    print("Usage: python3 injector_proxy.py <url to inject the js file> <js file to inject>")
-    sys.exit(1)
+parser = argparse.ArgumentParser(
+    usage="python3 injector_proxy.py <url to inject the js file> <js file to inject> [options]")
+parser.add_argument("target_url")
+parser.add_argument("js_file")
+parser.add_argument("--port", type=int, default=8080)
+parser.add_argument("--async", dest="use_async", action="store_true",
+                    help="serve with asyncio instead of a thread-per-connection HTTP server")
+parser.add_argument("--workers", type=int, default=1,
+                    help="number of worker processes sharing the port via SO_REUSEPORT")
+parser.add_argument("--keepalive-timeout", type=float, default=5.0,
+                    help="seconds an idle HTTP/1.1 client connection is kept open")
+parser.add_argument("--concurrency", type=int, default=256,
+                    help="max requests handled at once in --async mode")
+parser.add_argument("--pool-size", type=int, default=32,
+                    help="max keep-alive upstream connections")
+parser.add_argument("--timeout", type=float, default=30.0,
+                    help="per-request timeout in seconds (upstream fetch and client I/O)")
+parser.add_argument("--cache-size", type=int, default=32 * 1024 * 1024,
+                    help="max bytes of injected responses kept in memory (0 disables the cache)")
+parser.add_argument("--cache-ttl", type=float, default=10.0,
+                    help="freshness lifetime in seconds when the upstream sends no Cache-Control/Expires")
+parser.add_argument("--stats-path", default=None,
+                    help="serve cache counters as JSON on this path (e.g. /.proxy-stats)")
+args = parser.parse_args()
 
-TARGET_URL = sys.argv[1]
-JS_FILE_PATH = sys.argv[2]
+TARGET_URL = args.target_url
+JS_FILE_PATH = args.js_file
 
 try:
     with open(JS_FILE_PATH, "r", encoding="utf-8") as f:
@@ -18,46 +55,826 @@ except Exception as e:
 
 INJECT_SNIPPET = f"<script>{OVERLAY_JS}</script>"
 
+class _TimedPool(HTTPConnectionPool):
+    # requests never passes pool_timeout, so a full blocking pool would wait forever
+    pool_timeout = None
+
+    def _get_conn(self, timeout=None):
+        return super()._get_conn(self.pool_timeout if timeout is None else timeout)
+
+class _TimedHTTPSPool(_TimedPool, HTTPSConnectionPool):
+    pass
+
+class PoolTimeoutAdapter(HTTPAdapter):
+    """HTTPAdapter whose blocking pool waits at most pool_timeout seconds for a free connection."""
+    def __init__(self, pool_timeout=None, **kwargs):
+        self.pool_timeout = pool_timeout
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *pool_args, **pool_kwargs):
+        super().init_poolmanager(*pool_args, **pool_kwargs)
+        timeout = self.pool_timeout
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": type("TimedHTTPPool", (_TimedPool,), {"pool_timeout": timeout}),
+            "https": type("TimedHTTPSPool", (_TimedHTTPSPool,), {"pool_timeout": timeout}),
+        }
+
+def make_upstream_session(pool_size, pool_timeout=None):
+    # Keep-alive connection pool to the upstream, bounded at pool_size connections;
+    # a request waits at most pool_timeout for one to free up
+    session = requests.Session()
+    adapter = PoolTimeoutAdapter(pool_timeout, pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+UPSTREAM = make_upstream_session(args.pool_size, args.timeout)
+
+def is_target_path(path):
+    return path == "/" or path == TARGET_URL or path == TARGET_URL.replace("http://", "").replace("https://", "")
+
+CHUNK_SIZE = 16 * 1024
+BODY_MARKER = b"</body>"
+# Hop-by-hop headers are never forwarded from the upstream response
+HOP_BY_HOP = {"connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+              "te", "trailers", "transfer-encoding", "upgrade"}
+
+class BodyInjector:
+    """
+    Incremental </body> matcher: feed() returns the bytes that are safe to send
+    now, finish() returns the rest with the snippet placed before the last
+    </body> (or appended if the page has none).
+    Only a len("</body>") - 1 byte look-behind is held back, plus the tail after
+    the most recent </body> (it may still turn out to be the last one). If that
+    tail grows past max_hold the held </body> is released and, unless another
+    one follows, the snippet ends up appended at the end of the stream.
+    """
+    def __init__(self, snippet, max_hold=64 * 1024):
+        self.snippet = snippet
+        self.max_hold = max_hold
+        self._held = b""
+        self._marker = False  # _held starts with a </body> that may be the last one
+
+    def feed(self, chunk):
+        keep = len(BODY_MARKER) - 1
+        data = self._held + chunk
+        idx = data.rfind(BODY_MARKER, max(0, len(self._held) - keep))
+        if idx >= 0:
+            out, self._held, self._marker = data[:idx], data[idx:], True
+        elif self._marker and len(data) <= self.max_hold:
+            out, self._held = b"", data
+        else:
+            cut = max(0, len(data) - keep)
+            out, self._held, self._marker = data[:cut], data[cut:], False
+        return out
+
+    def finish(self):
+        held, self._held = self._held, b""
+        if self._marker:
+            return self.snippet + held
+        return held + self.snippet
+
+def inject_stream(chunks):
+    injector = BodyInjector(INJECT_SNIPPET.encode('utf-8'))
+    for chunk in chunks:
+        out = injector.feed(chunk)
+        if out:
+            yield out
+    yield injector.finish()
+
+# Request headers passed on to the upstream; they are also part of the cache key
+FORWARD_HEADERS = ("accept-language",)
+# Injected HTML varies with the negotiated encoding and the forwarded headers
+VARY = ", ".join(["Accept-Encoding"] + [name.title() for name in FORWARD_HEADERS])
+
+def forwarded_headers(request_headers):
+    return {name: request_headers[name] for name in FORWARD_HEADERS if request_headers.get(name)}
+
+#######################
+# content negotiation #
+#######################
+COMPRESS_LEVEL = 6
+MIN_COMPRESS_SIZE = 256  # smaller bodies are sent as-is
+# zlib wbits for each content-coding we produce: gzip wrapper / zlib wrapper
+CODINGS = {"gzip": 31, "deflate": 15}
+
+def parse_accept_encoding(value):
+    """Returns {coding: q} for an Accept-Encoding header value."""
+    codings = {}
+    for part in value.split(","):
+        coding, *params = [p.strip() for p in part.split(";")]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, arg = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(arg)
+                except ValueError:
+                    q = 0.0
+        codings[coding.lower()] = q
+    return codings
+
+def choose_encoding(accept):
+    """
+    Picks gzip or deflate (gzip on a tie) by q-value, or None for identity
+    when the client accepts neither or explicitly ranks identity higher.
+    """
+    codings = parse_accept_encoding(accept or "")
+    best, best_q = None, 0.0
+    for coding in CODINGS:
+        q = codings.get(coding, codings.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    if best is not None and codings.get("identity", 0.0) > best_q:
+        return None
+    return best
+
+def compress_body(body, encoding):
+    z = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, CODINGS[encoding])
+    return z.compress(body) + z.flush()
+
+def compress_stream(chunks, encoding):
+    z = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, CODINGS[encoding])
+    for chunk in chunks:
+        out = z.compress(chunk)
+        if out:
+            yield out
+    yield z.flush()
+
+def upstream_headers(headers, encoding):
+    # Non-HTML is relayed still encoded, so only ask for a coding the client takes
+    return dict(headers or {}, **{"Accept-Encoding": encoding or "identity"})
+
+def is_html(resp):
+    return "text/html" in resp.headers.get("content-type", "")
+
+def open_injected(timeout=None, headers=None, encoding=None):
+    """
+    Opens a streaming fetch of TARGET_URL.
+    Returns (status, headers, chunks, content_length): HTML is decoded, passed
+    through inject_stream and compressed with `encoding` if one was negotiated
+    (length unknown, so it is sent chunked); anything else is relayed as the raw
+    upstream bytes with the upstream headers.
+    """
+    return relay_upstream(UPSTREAM.get(TARGET_URL, headers=upstream_headers(headers, encoding),
+                                       timeout=timeout, stream=True), encoding)
+
+def relay_upstream(resp, encoding=None):
+    content_type = resp.headers.get("content-type", "")
+    if "text/html" in content_type:
+        headers = [("Content-type", content_type), ("Vary", VARY)]
+        chunks = inject_stream(resp.iter_content(CHUNK_SIZE))
+        if encoding is not None:
+            headers.append(("Content-Encoding", encoding))
+            chunks = compress_stream(chunks, encoding)
+        return resp.status_code, headers, UpstreamStream(resp, chunks), None
+    headers = [(k, v) for k, v in resp.headers.items()
+               if k.lower() not in HOP_BY_HOP and k.lower() not in ("content-length", "server", "date")]
+    length = resp.headers.get("content-length")
+    return resp.status_code, headers, \
+        UpstreamStream(resp, resp.raw.stream(CHUNK_SIZE, decode_content=False)), \
+        int(length) if length is not None and length.isdigit() else None
+
+class UpstreamStream:
+    """
+    Iterator over the body chunks of an upstream response. close() always
+    releases the upstream connection back to the pool, even if iteration never
+    started (closing an unstarted generator would not run its cleanup).
+    """
+    def __init__(self, resp, chunks):
+        self._resp = resp
+        self._chunks = chunks
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._chunks)
+        except StopIteration:
+            self.close()
+            raise
+
+    def close(self):
+        try:
+            self._chunks.close()
+        except ValueError:
+            pass  # still running on another thread; closing resp below ends its read
+        finally:
+            self._resp.close()
+
+def frame_chunk(data):
+    """HTTP/1.1 chunked transfer-encoding frame."""
+    return b"%X\r\n" % len(data) + data + b"\r\n"
+
+LAST_CHUNK = b"0\r\n\r\n"
+
+###########################
+# injected-response cache #
+###########################
+def parse_cache_control(value):
+    directives = {}
+    for part in value.split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip().strip('"')
+    return directives
+
+def freshness(headers, default_ttl):
+    """
+    Returns (ttl, must_revalidate) for an upstream response, or None if a
+    shared cache may not store it (no-store / private).
+    """
+    cc = parse_cache_control(headers.get("cache-control", ""))
+    if "no-store" in cc or "private" in cc:
+        return None
+    ttl = None
+    for name in ("s-maxage", "max-age"):
+        if cc.get(name, "").isdigit():
+            ttl = int(cc[name])
+            break
+    if ttl is None and headers.get("expires"):
+        try:
+            expires = parsedate_to_datetime(headers["expires"]).timestamp()
+            date = parsedate_to_datetime(headers["date"]).timestamp() if headers.get("date") else time.time()
+            ttl = max(0.0, expires - date)
+        except (TypeError, ValueError):
+            ttl = 0  # an invalid Expires means already expired
+    if ttl is None:
+        ttl = default_ttl
+    if "no-cache" in cc:
+        ttl = 0
+    age = headers.get("age", "")
+    if age.isdigit():
+        ttl = max(0, ttl - int(age))
+    must_revalidate = "no-cache" in cc or "must-revalidate" in cc or "proxy-revalidate" in cc
+    return ttl, must_revalidate
+
+class CacheEntry:
+    __slots__ = ("status", "headers", "body", "variants", "etag", "last_modified",
+                 "stored_at", "ttl", "must_revalidate")
+
+    def __init__(self, status, headers, body, etag, last_modified, stored_at, policy):
+        self.status = status
+        self.headers = headers
+        self.body = body  # identity body; headers carry no Content-Encoding
+        self.variants = {}  # content-coding -> precompressed body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+        self.ttl, self.must_revalidate = policy
+
+    @property
+    def size(self):
+        return len(self.body) + sum(map(len, self.variants.values()))
+
+def _once(body):
+    yield body
+
+class ResponseCache:
+    """
+    Size-bounded LRU cache of final injected responses. Each entry keeps the
+    identity body and, once requested, a precompressed body per content-coding.
+    Fresh entries are served directly. A stale entry is served as-is while one
+    background conditional refresh (If-None-Match / If-Modified-Since) runs for
+    its key, unless the upstream asked for must-revalidate / no-cache, in which
+    case the refresh runs first. Concurrent misses on a key wait for a single
+    upstream fetch instead of each going upstream.
+    """
+    def __init__(self, max_bytes, default_ttl, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> CacheEntry
+        self._size = 0
+        self._flights = {}  # key -> threading.Event set when the upstream fetch for key ends
+        self._lock = threading.Lock()
+        self.counters = dict.fromkeys(
+            ("hits", "stale_hits", "misses", "coalesced", "revalidations",
+             "not_modified", "stores", "evictions", "errors"), 0)
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, entries=len(self._entries), bytes=self._size)
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _fresh(self, entry):
+        return self._clock() - entry.stored_at < entry.ttl
+
+    def _serve(self, key, entry, encoding):
+        headers = list(entry.headers)
+        body = entry.body
+        if encoding is not None and len(body) >= MIN_COMPRESS_SIZE:
+            body = entry.variants.get(encoding)
+            if body is None:
+                # Compressed once per entry and coding, then reused
+                body = compress_body(entry.body, encoding)
+                with self._lock:
+                    if encoding not in entry.variants:
+                        entry.variants[encoding] = body
+                        if self._entries.get(key) is entry:
+                            self._size += len(body)
+                            self._shrink()
+            headers.append(("Content-Encoding", encoding))
+        age = int(max(0, self._clock() - entry.stored_at))
+        headers.append(("Age", str(age)))
+        return entry.status, headers, _once(body), len(body)
+
+    def _shrink(self):
+        # Caller holds the lock
+        while self._size > self.max_bytes:
+            _, dropped = self._entries.popitem(last=False)
+            self._size -= dropped.size
+            self.counters["evictions"] += 1
+
+    def _store(self, key, entry):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old.size
+            if entry.size > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self._size += entry.size
+            self.counters["stores"] += 1
+            self._shrink()
+
+    def _remove(self, key):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old.size
+
+    def _land(self, key, flight):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight.set()
+
+    def open(self, key, timeout=None, encoding=None):
+        """Same contract as open_injected(); key is (url, forwarded header items)."""
+        refresh = hit = False
+        with self._lock:
+            entry = self._entries.get(key)
+            flight = self._flights.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                fresh = self._fresh(entry)
+                if fresh or not entry.must_revalidate:
+                    self.counters["hits" if fresh else "stale_hits"] += 1
+                    hit = True
+                    if not fresh and flight is None:
+                        flight = self._flights[key] = threading.Event()
+                        refresh = True
+            leader = not hit and flight is None
+            if leader:
+                flight = self._flights[key] = threading.Event()
+        if hit:
+            if refresh:
+                # Serve the stale copy; one background request brings it up to date
+                threading.Thread(target=self._refresh, args=(key, entry, flight, timeout), daemon=True).start()
+            return self._serve(key, entry, encoding)
+        if leader:
+            try:
+                if entry is None:
+                    self._count("misses")
+                    return self._fill(key, timeout, encoding)
+                self._revalidate(key, entry, timeout, keep_on_error=False)
+            finally:
+                self._land(key, flight)
+        else:
+            # Another request is already fetching this key; share its result
+            self._count("coalesced")
+            flight.wait(timeout)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            return self._serve(key, entry, encoding)
+        return open_injected(timeout, dict(key[1]), encoding)
+
+    def _fill(self, key, timeout, encoding):
+        resp = UPSTREAM.get(TARGET_URL, headers=upstream_headers(dict(key[1]), encoding),
+                            timeout=timeout, stream=True)
+        policy = freshness(resp.headers, self.default_ttl) \
+            if resp.status_code == 200 and is_html(resp) else None
+        if policy is None:
+            return relay_upstream(resp, encoding)
+        status, headers, chunks, _ = relay_upstream(resp)
+        # Cacheable: read the whole page here so waiting requests can share it
+        try:
+            entry = CacheEntry(status, headers, b"".join(chunks), resp.headers.get("etag"),
+                               resp.headers.get("last-modified"), self._clock(), policy)
+        finally:
+            chunks.close()
+        self._store(key, entry)
+        return self._serve(key, entry, encoding)
+
+    def _revalidate(self, key, entry, timeout, keep_on_error):
+        self._count("revalidations")
+        conditional = dict(key[1])
+        if entry.etag:
+            conditional["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            conditional["If-Modified-Since"] = entry.last_modified
+        try:
+            resp = UPSTREAM.get(TARGET_URL, headers=conditional, timeout=timeout, stream=True)
+        except Exception:
+            self._count("errors")
+            if not keep_on_error:
+                self._remove(key)
+                raise
+            return
+        with resp:
+            policy = freshness(resp.headers, self.default_ttl)
+            if resp.status_code == 304:
+                self._count("not_modified")
+                if policy is None:
+                    self._remove(key)
+                    return
+                with self._lock:
+                    entry.stored_at = self._clock()
+                    entry.ttl, entry.must_revalidate = policy
+                    entry.etag = resp.headers.get("etag", entry.etag)
+                    entry.last_modified = resp.headers.get("last-modified", entry.last_modified)
+                return
+            if resp.status_code != 200 or not is_html(resp) or policy is None:
+                self._remove(key)
+                return
+            status, headers, chunks, _ = relay_upstream(resp)
+            try:
+                body = b"".join(chunks)
+            finally:
+                chunks.close()
+            self._store(key, CacheEntry(status, headers, body, resp.headers.get("etag"),
+                                        resp.headers.get("last-modified"), self._clock(), policy))
+
+    def _refresh(self, key, entry, flight, timeout):
+        try:
+            self._revalidate(key, entry, timeout, keep_on_error=True)
+        finally:
+            self._land(key, flight)
+
+CACHE = ResponseCache(args.cache_size, args.cache_ttl) if args.cache_size > 0 else None
+
+def open_target(request_headers, timeout=None):
+    """open_injected() through the response cache, when it is enabled."""
+    headers = forwarded_headers(request_headers)
+    encoding = choose_encoding(request_headers.get("accept-encoding"))
+    if CACHE is None:
+        return open_injected(timeout, headers, encoding)
+    return CACHE.open((TARGET_URL, tuple(sorted(headers.items()))), timeout, encoding)
+
+def stats_body():
+    return json.dumps(CACHE.stats() if CACHE is not None else {}).encode('utf-8')
+
 class InjectHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1: connections stay open between requests unless the client asks
+    # otherwise; every response is framed by Content-Length or chunked encoding
+    protocol_version = "HTTP/1.1"
+    # Idle keep-alive connections are dropped after this
+    timeout = args.keepalive_timeout
+
+    def handle_one_request(self):
+        # Only the wait for the next request line uses the keep-alive timeout...
+        self.connection.settimeout(args.keepalive_timeout)
+        super().handle_one_request()
+
+    def parse_request(self):
+        # ...once it has arrived, headers and response I/O get the per-request timeout
+        self.connection.settimeout(args.timeout)
+        return super().parse_request()
+
+    def send_body(self, status, body, content_type=None):
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
     def do_GET(self):
-        if self.path == "/" or self.path == TARGET_URL or self.path == TARGET_URL.replace("http://", "").replace("https://", ""):
-            # Fetch the real content
-            try:
-                resp = requests.get(TARGET_URL)
-                content_type = resp.headers.get("content-type", "")
-                content = resp.text
-                if "text/html" in content_type:
-                    if "</body>" in content:
-                        content = content.replace("</body>", f"{INJECT_SNIPPET}</body>")
-                    else:
-                        content += INJECT_SNIPPET
-                    self.send_response(resp.status_code)
-                    self.send_header("Content-type", content_type)
-                    self.end_headers()
-                    self.wfile.write(content.encode('utf-8'))
-                else:
-                    self.send_response(resp.status_code)
-                    for k, v in resp.headers.items():
-                        self.send_header(k, v)
-                    self.end_headers()
-                    self.wfile.write(resp.content)
+        if args.stats_path and self.path == args.stats_path:
+            self.send_body(200, stats_body(), "application/json")
+        elif is_target_path(self.path):
+            # Fetch the real content (or the cached injected copy)
+            try:
+                status, headers, chunks, length = open_target(self.headers, args.timeout)
             except Exception as e:
-                self.send_response(502)
+                self.send_body(502, f"Proxy error: {e}".encode('utf-8'))
+                return
+            # HTTP/1.0 clients don't understand chunked encoding: an unknown
+            # length is delimited by closing the connection instead
+            chunked = length is None and self.request_version != "HTTP/1.0"
+            try:
+                self.send_response(status)
+                for k, v in headers:
+                    self.send_header(k, v)
+                if chunked:
+                    self.send_header("Transfer-Encoding", "chunked")
+                elif length is not None:
+                    self.send_header("Content-Length", str(length))
+                else:
+                    self.send_header("Connection", "close")
                 self.end_headers()
-                self.wfile.write(f"Proxy error: {e}".encode('utf-8'))
+                for chunk in chunks:
+                    if chunk:
+                        self.wfile.write(frame_chunk(chunk) if chunked else chunk)
+                if chunked:
+                    self.wfile.write(LAST_CHUNK)
+            except Exception:
+                # Upstream read or client write failed mid-response: the response
+                # is cut short, so drop the connection (like the asyncio mode)
+                self.close_connection = True
+            finally:
+                chunks.close()
         else:
-            self.send_response(404)
-            self.end_headers()
-            self.wfile.write(b"Not Found")
+            self.send_body(404, b"Not Found")
+
+class ProxyHTTPServer(ThreadingHTTPServer):
+    """
+    Thread-per-connection server. server_close() waits for in-flight
+    connections (daemon_threads is off) so shutdown is graceful; with
+    reuse_port several processes can bind the same port.
+    """
+    daemon_threads = False
 
-def run(server_class=HTTPServer, handler_class=InjectHandler, port=8080):
+    def __init__(self, server_address, handler_class, reuse_port=False):
+        self.reuse_port = reuse_port
+        super().__init__(server_address, handler_class)
+
+    def server_bind(self):
+        if self.reuse_port:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+def run(server_class=ProxyHTTPServer, handler_class=InjectHandler, port=8080, reuse_port=False):
     server_address = ('', port)
-    httpd = server_class(server_address, handler_class)
-    print(f"Serving proxy on http://127.0.0.1:{port}/ (injecting into {TARGET_URL})")
+    httpd = server_class(server_address, handler_class, reuse_port=reuse_port)
+    # SIGTERM shuts down the same way as Ctrl-C
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    print(f"Serving proxy on http://127.0.0.1:{port}/ (injecting into {TARGET_URL}) [pid {os.getpid()}]")
     try:
         httpd.serve_forever()
     except KeyboardInterrupt:
         print("Shutting down...")
+    finally:
+        httpd.server_close()
+    if CACHE is not None:
+        print(f"Cache stats: {CACHE.stats()}")
+
+########################
+# asyncio serving mode #
+########################
+def format_response_head(status, headers):
+    try:
+        reason = HTTPStatus(status).phrase
+    except ValueError:
+        reason = ""
+    lines = [f"HTTP/1.1 {status} {reason}",
+             f"Server: {BaseHTTPRequestHandler.server_version}",
+             f"Date: {formatdate(usegmt=True)}"]
+    lines += [f"{k}: {v}" for k, v in headers]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode('latin-1')
+
+async def read_request_head(reader):
+    """Returns (method, path, version, headers) or None if the client sent nothing."""
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    method, path, version = request_line.decode('latin-1').split()
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode('latin-1').partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return method, path, version, headers
+
+def wants_keep_alive(version, headers):
+    tokens = {t.strip().lower() for t in headers.get("connection", "").split(",")}
+    if "close" in tokens:
+        return False
+    return version != "HTTP/1.0" or "keep-alive" in tokens
+
+def connection_headers(keep_alive):
+    return [("Connection", "keep-alive")] if keep_alive else [("Connection", "close")]
+
+async def send_simple(writer, status, body, timeout, keep_alive, headers=()):
+    writer.write(format_response_head(
+        status, list(headers) + [("Content-Length", str(len(body)))] + connection_headers(keep_alive)))
+    writer.write(body)
+    await asyncio.wait_for(writer.drain(), timeout)
+
+def _close_opened(future):
+    # open_target() finished after we gave up on it: release its upstream response
+    if not future.cancelled() and future.exception() is None:
+        future.result()[2].close()
+
+async def serve_request(writer, executor, timeout, method, path, version, request_headers, keep_alive):
+    """Writes one response; returns False if the connection must be closed afterwards."""
+    loop = asyncio.get_running_loop()
+    if method != "GET":
+        # Any request body is left unread, so the connection can't be reused
+        await send_simple(writer, 501, b"Unsupported method", timeout, False)
+        return False
+    if args.stats_path and path == args.stats_path:
+        await send_simple(writer, 200, stats_body(), timeout, keep_alive, [("Content-type", "application/json")])
+        return keep_alive
+    if not is_target_path(path):
+        await send_simple(writer, 404, b"Not Found", timeout, keep_alive)
+        return keep_alive
+    # The blocking upstream fetch runs on the executor; the pooled
+    # session reuses keep-alive connections across requests
+    opening = executor.submit(open_target, request_headers, timeout)
+    try:
+        status, headers, chunks, length = await asyncio.wait_for(asyncio.wrap_future(opening), timeout)
+    except BaseException as e:
+        opening.add_done_callback(_close_opened)
+        if not isinstance(e, Exception):
+            raise
+        await send_simple(writer, 502, f"Proxy error: {e}".encode('utf-8'), timeout, keep_alive)
+        return keep_alive
+    # HTTP/1.0 clients don't understand chunked encoding: an unknown length
+    # is delimited by closing the connection instead
+    chunked = length is None and version != "HTTP/1.0"
+    if length is not None:
+        framing = [("Content-Length", str(length))]
+    elif chunked:
+        framing = [("Transfer-Encoding", "chunked")]
+    else:
+        framing, keep_alive = [], False
+    reading = None
+    try:
+        writer.write(format_response_head(status, headers + framing + connection_headers(keep_alive)))
+        # Relay each upstream chunk as soon as it arrives
+        while True:
+            reading = executor.submit(next, chunks, None)
+            try:
+                chunk = await asyncio.wait_for(asyncio.wrap_future(reading), timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                raise
+            except Exception as e:
+                # Upstream failed mid-body; the response can only be cut short
+                raise ConnectionError(f"upstream read failed: {e}") from e
+            if chunk is None:
+                break
+            if chunk:
+                writer.write(frame_chunk(chunk) if chunked else chunk)
+                await asyncio.wait_for(writer.drain(), timeout)
+        if chunked:
+            writer.write(LAST_CHUNK)
+        await asyncio.wait_for(writer.drain(), timeout)
+    finally:
+        if reading is None or reading.done():
+            await loop.run_in_executor(executor, chunks.close)
+        else:
+            # Timed out with the worker thread still inside next(chunks); closing
+            # the generator now would raise "generator already executing", so
+            # close it (and the upstream response) once that call returns
+            reading.add_done_callback(lambda _: chunks.close())
+    return keep_alive
+
+async def handle_client(reader, writer, limiter, executor, timeout, keepalive_timeout, idle, stopping):
+    """
+    Serves requests on one connection until the client closes it, asks for
+    Connection: close, idles for keepalive_timeout, or the server is stopping.
+    While waiting for the next request the task is in `idle`, so shutdown can
+    drop it without cutting a response short.
+    """
+    task = asyncio.current_task()
+    try:
+        while not stopping.is_set():
+            idle.add(task)
+            try:
+                head = await asyncio.wait_for(read_request_head(reader), keepalive_timeout)
+            finally:
+                idle.discard(task)
+            if head is None:
+                return
+            method, path, version, request_headers = head
+            keep_alive = wants_keep_alive(version, request_headers) and not stopping.is_set()
+            async with limiter:
+                if not await serve_request(writer, executor, timeout, method, path, version,
+                                           request_headers, keep_alive):
+                    return
+    except (asyncio.TimeoutError, ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+def run_async(port=8080, concurrency=256, pool_size=32, timeout=30.0, keepalive_timeout=5.0, reuse_port=False):
+    async def serve():
+        limiter = asyncio.Semaphore(concurrency)
+        executor = ThreadPoolExecutor(max_workers=pool_size)
+        connections, idle, stopping = set(), set(), asyncio.Event()
+
+        async def on_client(reader, writer):
+            task = asyncio.current_task()
+            connections.add(task)
+            try:
+                await handle_client(reader, writer, limiter, executor, timeout, keepalive_timeout, idle, stopping)
+            finally:
+                connections.discard(task)
+
+        server = await asyncio.start_server(on_client, '', port, reuse_port=reuse_port)
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stopping.set)
+        print(f"Serving proxy (asyncio) on http://127.0.0.1:{port}/ (injecting into {TARGET_URL}) [pid {os.getpid()}]")
+        try:
+            await stopping.wait()
+        finally:
+            # Graceful shutdown: stop accepting, drop idle keep-alive
+            # connections and give in-flight responses up to `timeout` to finish
+            stopping.set()
+            server.close()
+            for task in list(idle):
+                task.cancel()
+            pending = set(connections)
+            if pending:
+                _, pending = await asyncio.wait(pending, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            executor.shutdown(wait=False)
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    print("Shutting down...")
+    if CACHE is not None:
+        print(f"Cache stats: {CACHE.stats()}")
+
+################
+# worker fleet #
+################
+def serve_workers(workers, serve):
+    """
+    Pre-forks `workers` processes that each call serve() with their own
+    SO_REUSEPORT listener on the same port; the kernel spreads incoming
+    connections across them. A worker that dies is restarted. SIGINT/SIGTERM
+    send SIGTERM to every worker and wait for them to finish gracefully.
+    Each worker keeps its own response cache and upstream connection pool.
+    """
+    children = {}  # pid -> start time
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            # Ctrl-C reaches the whole process group; only the parent acts on it
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            code = 0
+            try:
+                serve()
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                sys.stdout.flush()
+                os._exit(code)
+        children[pid] = time.monotonic()
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for _ in range(workers):
+        spawn()
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = children.pop(pid, None)
+        if started is None or stopping:
+            continue
+        print(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}, restarting")
+        if time.monotonic() - started < 1.0:
+            time.sleep(1.0)  # don't spin if workers die right at startup
+        if not stopping:
+            spawn()
+    print("All workers stopped")
 
 if __name__ == "__main__":
-    run()
+    reuse_port = args.workers > 1
+    if args.use_async:
+        serve = lambda: run_async(args.port, args.concurrency, args.pool_size, args.timeout,
+                                  args.keepalive_timeout, reuse_port)
+    else:
+        serve = lambda: run(port=args.port, reuse_port=reuse_port)
+    if args.workers > 1:
+        serve_workers(args.workers, serve)
+    else:
+        serve()
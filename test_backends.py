@@ -0,0 +1,119 @@
+"""
+Cross-backend conformance: every available backend must match the reference
+backend byte for byte (AES-IGE, HMAC, HKDF) and keep the same RSA contract,
+including ValueError("Incorrect padding") on invalid ciphertexts.
+"""
+import pytest
+
+import client
+
+BACKENDS = client.available_backends()
+
+
+@pytest.fixture(scope='module')
+def rsa():
+    return client.RSAKey.generate(1024)
+
+
+@pytest.fixture
+def ref():
+    return client.get_backend('reference')
+
+
+@pytest.mark.parametrize('name', BACKENDS)
+@pytest.mark.parametrize('size', [0, 5, 16, 31, 48, 1000])
+def test_aes_ige(name, size, ref):
+    backend = client.get_backend(name)
+    key, iv, data = client.random_bytes(32), client.random_bytes(32), client.random_bytes(size)
+    ct = ref.aes_ige_encrypt(key, iv, data)
+    assert backend.aes_ige_encrypt(key, iv, data) == ct
+    assert backend.aes_ige_decrypt(key, iv, ct) == ref.aes_ige_decrypt(key, iv, ct)
+
+
+@pytest.mark.parametrize('name', BACKENDS)
+def test_aes_ige_many(name, ref):
+    backend = client.get_backend(name)
+    sizes = [16] * 70 + [64, 100, 4096]
+    keys = [client.random_bytes(32) for _ in sizes]
+    ivs = [client.random_bytes(32) for _ in sizes]
+    datas = [client.random_bytes(size) for size in sizes]
+    cts = backend.aes_ige_encrypt_many(keys, ivs, datas)
+    assert cts == [ref.aes_ige_encrypt(k, iv, d) for k, iv, d in zip(keys, ivs, datas)]
+    assert backend.aes_ige_decrypt_many(keys, ivs, cts) == [
+        ref.aes_ige_decrypt(k, iv, c) for k, iv, c in zip(keys, ivs, cts)]
+
+
+@pytest.mark.parametrize('name', BACKENDS)
+def test_aes_ige_bad_length(name):
+    with pytest.raises(ValueError):
+        client.get_backend(name).aes_ige_decrypt(client.random_bytes(32), client.random_bytes(32), b'x' * 17)
+
+
+@pytest.mark.parametrize('name', BACKENDS)
+@pytest.mark.parametrize('size', [0, 7, 64, 200])
+def test_hmac_hkdf(name, size, ref):
+    backend = client.get_backend(name)
+    key, msg = client.random_bytes(32), client.random_bytes(size)
+    assert backend.hmac_sha256(key, msg) == ref.hmac_sha256(key, msg)
+    assert backend.hkdf(key, msg, b'info', 40 + size) == ref.hkdf(key, msg, b'info', 40 + size)
+
+
+@pytest.mark.parametrize('name', BACKENDS)
+def test_rsa_round_trip(name, ref, rsa):
+    backend = client.get_backend(name)
+    msg = client.random_bytes(32)
+    # PKCS#1 v1.5 is randomized: check both directions decrypt to the same bytes
+    assert ref.rsa_decrypt(backend.rsa_encrypt(msg, rsa), rsa) == msg
+    assert backend.rsa_decrypt(ref.rsa_encrypt(msg, rsa), rsa) == msg
+
+
+@pytest.mark.parametrize('name', BACKENDS)
+@pytest.mark.parametrize('em_prefix', [b'\x00\x01', b'\x01\x02', b'\x00\x00'])
+def test_rsa_invalid_padding(name, em_prefix, rsa):
+    klen = (rsa.n.bit_length() + 7) // 8
+    em = em_prefix + b'\xff' * (klen - 2 - 33) + b'\x00' + client.random_bytes(32)
+    ct = client.int_to_bytes(rsa.encrypt(client.bytes_to_int(em)), klen)
+    with pytest.raises(ValueError, match="Incorrect padding"):
+        client.get_backend(name).rsa_decrypt(ct, rsa)
+
+
+@pytest.mark.parametrize('name', BACKENDS)
+def test_rsa_short_padding_string(name, rsa):
+    # Zero separator inside the first 8 padding bytes
+    klen = (rsa.n.bit_length() + 7) // 8
+    em = b'\x00\x02' + b'\x11' * 4 + b'\x00' + client.random_bytes(klen - 7)
+    ct = client.int_to_bytes(rsa.encrypt(client.bytes_to_int(em)), klen)
+    with pytest.raises(ValueError, match="Incorrect padding"):
+        client.get_backend(name).rsa_decrypt(ct, rsa)
+
+
+@pytest.mark.parametrize('name', BACKENDS)
+def test_rsa_tampered_ciphertext(name, ref, rsa):
+    backend = client.get_backend(name)
+    ct = bytearray(ref.rsa_encrypt(client.random_bytes(32), rsa))
+    for pos in (0, len(ct) // 2, len(ct) - 1):
+        tampered = bytearray(ct)
+        tampered[pos] ^= 0x01
+        tampered = bytes(tampered)
+        try:
+            expected = ref.rsa_decrypt(tampered, rsa)
+        except ValueError as e:
+            with pytest.raises(ValueError, match=str(e)):
+                backend.rsa_decrypt(tampered, rsa)
+        else:
+            assert backend.rsa_decrypt(tampered, rsa) == expected
+
+
+@pytest.mark.parametrize('name', BACKENDS)
+def test_high_level_api_uses_backend(name, rsa):
+    previous = client.get_backend().name
+    client.set_backend(name)
+    try:
+        klen = (rsa.n.bit_length() + 7) // 8
+        bad = client.int_to_bytes(rsa.encrypt(client.bytes_to_int(b'\x00\x01' + b'\xff' * (klen - 2))), klen)
+        with pytest.raises(ValueError):
+            client.rsa_decrypt(bad, rsa)
+        session = client.RottikolSession.create_from_dh(client.random_bytes(256))
+        assert session.decrypt(session.encrypt(b'hello'))[2] == b'hello'
+    finally:
+        client.set_backend(previous)